@@ -0,0 +1,95 @@
+"""
+Compare 16-char hex keys (VARCHAR(16)) with 64-bit BLAKE2b keys (BIGINT):
+key generation speed, and primary-key index size and insert throughput in Postgres.
+
+Key generation runs anywhere. The Postgres part needs the DB_* environment
+variables and uses a scratch schema that is dropped afterwards:
+
+    uv run python benchmarks/bench_bigint_keys.py --rows 500000
+    uv run python benchmarks/bench_bigint_keys.py --rows 500000 --skip-db
+
+Sample key generation run (BLAKE2b is slower per key, the gain is in the 8-byte column and index):
+
+    before: sha256 hex[:16]                 849,434 keys/s
+    after: keyed blake2b 64-bit             545,684 keys/s
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.hash import generate_match_hash, generate_match_key  # noqa: E402
+
+SCHEMA = "bench_bigint_keys"
+
+
+def generate(name: str, func: Callable, count: int) -> List:
+    started = time.perf_counter()
+    keys = [func(f"match-{index // 10}", f"Player{index % 10}", "NA1") for index in range(count)]
+    elapsed = time.perf_counter() - started
+    print(f"{name:<34} {count / elapsed:>12,.0f} keys/s")
+    return keys
+
+
+def load(name: str, conn, cursor, column_type: str, keys: List, batch_size: int) -> None:
+    from psycopg2.extras import execute_values
+
+    table = f"keys_{column_type.split('(')[0].lower()}"
+    cursor.execute(f"CREATE TABLE {table} (key {column_type} PRIMARY KEY, payload INT)")
+    conn.commit()
+
+    started = time.perf_counter()
+    for start in range(0, len(keys), batch_size):
+        execute_values(
+            cursor,
+            f"INSERT INTO {table} (key, payload) VALUES %s ON CONFLICT DO NOTHING",
+            [(key, index) for index, key in enumerate(keys[start:start + batch_size], start)],
+            page_size=batch_size
+        )
+    conn.commit()
+    elapsed = time.perf_counter() - started
+
+    cursor.execute("SELECT pg_indexes_size(%s)", (table,))
+    index_bytes = cursor.fetchone()[0]
+    print(f"{name:<34} {len(keys) / elapsed:>12,.0f} rows/s   index {index_bytes / 1024 / 1024:8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--skip-db", action="store_true", help="only measure key generation")
+    args = parser.parse_args()
+
+    hex_keys = generate("before: sha256 hex[:16]", generate_match_hash, args.rows)
+    bigint_keys = generate("after: keyed blake2b 64-bit", generate_match_key, args.rows)
+    if args.skip_db:
+        return
+
+    # Imported here so --skip-db runs without psycopg2 installed
+    from app.database.connection import connect_from_env
+
+    print()
+    conn = connect_from_env()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        conn.commit()
+
+        load("before: VARCHAR(16) primary key", conn, cursor, "VARCHAR(16)", hex_keys, args.batch_size)
+        load("after: BIGINT primary key", conn, cursor, "BIGINT", bigint_keys, args.batch_size)
+    finally:
+        conn.rollback()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare match_stats load throughput (rows per second) for the original per-row
+insert path, multi-row inserts and the COPY-based bulk loader BackfillJob uses.
+
+Needs a local Postgres reachable through the DB_* environment variables.
+Everything is loaded into a scratch schema that is dropped afterwards:
+
+    uv run python benchmarks/bench_copy_load.py --rows 100000
+
+The original path (model_dump(), one INSERT, commit and subscriber lookup per row)
+is slow enough that it only loads --row-insert-limit rows, its rate is still comparable.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.database.connection import connect_from_env  # noqa: E402
+from app.database.migrations import migrate  # noqa: E402
+from app.database.tables import MatchStatsTable, Table  # noqa: E402
+from app.models.match import MatchStats  # noqa: E402
+from utils.hash import generate_match_hash, generate_match_key  # noqa: E402
+
+SCHEMA = "bench_copy_load"
+AGENTS = ["Jett", "Sova", "Omen", "Killjoy", "Raze", "Sage", "Reyna", "Viper", "Skye", "Fade"]
+MAPS = ["Ascent", "Bind", "Haven", "Split", "Lotus", "Sunset", "Icebox"]
+
+
+def build_rows(count: int, seed: int) -> List[MatchStats]:
+    """Synthetic match history, one row per (match, player)"""
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        won, lost = rng.randint(0, 13), 13
+        if rng.random() < 0.5:
+            won, lost = lost, won
+        kills, deaths = rng.randint(5, 30), rng.randint(5, 25)
+        api_match_id = f"match-{seed}-{index // 10}"
+        rows.append(MatchStats(
+            match_id=generate_match_hash(api_match_id, f"Player{index % 10}", "NA1"),
+            match_key=generate_match_key(api_match_id, f"Player{index % 10}", "NA1"),
+            player_name=f"Player{index % 10}",
+            player_tag="NA1",
+            agent=rng.choice(AGENTS),
+            game_score=f"{won}-{lost}",
+            kills=kills,
+            deaths=deaths,
+            assists=rng.randint(0, 15),
+            damage_delta=rng.randint(-1500, 1500),
+            headshot_percentage=round(rng.uniform(5, 45), 1),
+            adr=round(rng.uniform(80, 220), 1),
+            acs=round(rng.uniform(100, 350), 1),
+            team_placement=rng.randint(1, 5),
+            map_name=rng.choice(MAPS),
+            match_result="Victory" if won > lost else "Defeat"
+        ))
+    return rows
+
+
+def measure(name: str, conn, cursor, rows: List[MatchStats], load: Callable) -> None:
+    cursor.execute("TRUNCATE match_stats CASCADE")
+    conn.commit()
+
+    started = time.perf_counter()
+    load(MatchStatsTable(conn, cursor), rows)
+    elapsed = time.perf_counter() - started
+
+    cursor.execute("SELECT COUNT(*) FROM match_stats")
+    loaded = cursor.fetchone()[0]
+    print(f"{name:<28} {len(rows):>8} rows {elapsed:8.2f} s {len(rows) / elapsed:>10,.0f} rows/s  ({loaded} stored)")
+
+
+def legacy_insert(table: MatchStatsTable, row: MatchStats) -> List[int]:
+    """The write path before batching: Table.insert (model_dump(), INSERT, commit), then a subscriber lookup"""
+    if not Table.insert(table, row):
+        return []
+    table.cursor.execute("SELECT discord_id FROM subscriptions WHERE account_id = %s", (row.account_id,))
+    return [discord_id for discord_id, in table.cursor.fetchall()]
+
+
+def insert_rows(table: MatchStatsTable, rows: List[MatchStats]) -> None:
+    for row in rows:
+        legacy_insert(table, row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--row-insert-limit", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.seed)
+    conn = connect_from_env()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        conn.commit()
+        migrate(conn, cursor)
+
+        measure("before: insert per row", conn, cursor, rows[:args.row_insert_limit], insert_rows)
+        measure("Table.insert_many", conn, cursor, rows, lambda table, batch: table.insert_many(batch))
+        measure("after: Table.copy_many", conn, cursor, rows, lambda table, batch: table.copy_many(batch))
+    finally:
+        conn.rollback()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compare the cost of building a notification embed per recipient with rendering
+it once per match and sharing it, at increasing subscriber fan-out.
+
+No Discord connection or database is needed, sends go to an in-memory channel
+that serializes each embed the way discord.py does before posting it:
+
+    uv run python benchmarks/bench_embed_render.py --matches 50 --fan-out 1 20 100 1000
+
+Sample run (send_bulk_notifications includes digest grouping and serializing every embed):
+
+    50 matches x 20 subscribers
+      before: build per recipient          1000 embeds     18.86 ms    18.86 us/notification
+      after: render once, share              50 embeds      1.02 ms     1.02 us/notification
+      send_bulk_notifications                50 embeds     18.12 ms    18.12 us/notification
+    50 matches x 1000 subscribers
+      before: build per recipient         50000 embeds   1240.91 ms    24.82 us/notification
+      after: render once, share              50 embeds      4.65 ms     0.09 us/notification
+      send_bulk_notifications                50 embeds    822.34 ms    16.45 us/notification
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_copy_load import build_rows  # noqa: E402
+from app.models.match import MatchStats  # noqa: E402
+from app.services.discord_notifier import DiscordNotifier  # noqa: E402
+
+
+class _Channel:
+    async def send(self, embeds):
+        for embed in embeds:
+            embed.to_dict()
+
+
+class _User:
+    dm_channel = _Channel()
+
+
+class _Bot:
+    def get_user(self, discord_user_id):
+        return _User()
+
+
+def render(name: str, matches: List[MatchStats], fan_out: int, build: Callable) -> None:
+    started = time.perf_counter()
+    embeds = build(matches, fan_out)
+    elapsed = time.perf_counter() - started
+    notifications = len(matches) * fan_out
+    print(f"  {name:<32} {len(set(map(id, embeds))):>8} embeds {elapsed * 1000:9.2f} ms"
+          f" {elapsed / notifications * 1e6:8.2f} us/notification")
+
+
+def per_recipient(notifier: DiscordNotifier) -> Callable:
+    return lambda matches, fan_out: [notifier._build_embed(stats) for stats in matches for _ in range(fan_out)]
+
+
+def shared(notifier: DiscordNotifier) -> Callable:
+    def build(matches, fan_out):
+        rendered = {stats.match_key: notifier._build_embed(stats) for stats in matches}
+        return [rendered[stats.match_key] for stats in matches for _ in range(fan_out)]
+    return build
+
+
+def dispatch(notifier: DiscordNotifier, matches: List[MatchStats], fan_out: int) -> None:
+    notifications = [
+        {"discord_user_id": recipient + 1, "stats": stats}
+        for stats in matches for recipient in range(fan_out)
+    ]
+    started = time.perf_counter()
+    asyncio.run(notifier.send_bulk_notifications(notifications))
+    elapsed = time.perf_counter() - started
+    print(f"  {'send_bulk_notifications':<32} {notifier.stats(reset=True)['embeds_rendered']:>8} embeds "
+          f"{elapsed * 1000:9.2f} ms {elapsed / len(notifications) * 1e6:8.2f} us/notification")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", type=int, default=50, help="new matches in the tick")
+    parser.add_argument("--fan-out", type=int, nargs="+", default=[1, 20, 100, 1000],
+                        help="subscribers per match")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    # Per-send log lines would dominate the dispatch timings
+    logging.disable(logging.INFO)
+
+    matches = build_rows(args.matches * 10, args.seed)[::10]
+    # Effectively no rate limit, only the notifier's own work is measured
+    notifier = DiscordNotifier(_Bot(), global_rate_limit=10 ** 9)
+
+    for fan_out in args.fan_out:
+        print(f"{args.matches} matches x {fan_out} subscribers")
+        render("before: build per recipient", matches, fan_out, per_recipient(notifier))
+        render("after: render once, share", matches, fan_out, shared(notifier))
+        dispatch(notifier, matches, fan_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark JSON decoding of Henrik v4 match payloads.
+
+Compares the previous _make_request path (stdlib json on the decoded text, as
+aiohttp's response.json() does) against decoding the raw bytes once with each
+installed backend.
+
+    uv run python benchmarks/bench_json_decode.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from henrik_payloads import build_match_response  # noqa: E402
+from utils.decoding import JSON_DECODERS, decode_body  # noqa: E402
+
+ITERATIONS = 200
+
+
+def main() -> None:
+    body = json.dumps(build_match_response(seed=42)).encode()
+    print(f"Payload size: {len(body) / 1024:.0f} KiB, {ITERATIONS} iterations\n")
+
+    def previous_path():
+        # response.json() decodes bytes to str, then runs stdlib json.loads
+        return json.loads(body.decode("utf-8"))
+
+    timings = {"previous (response.json)": timeit.timeit(previous_path, number=ITERATIONS)}
+    for name, decoder in JSON_DECODERS.items():
+        timings[f"decode_body + {name}"] = timeit.timeit(
+            lambda: decode_body(body, "application/json", decoder), number=ITERATIONS
+        )
+
+    baseline = timings["previous (response.json)"]
+    for name, total in timings.items():
+        per_call = total / ITERATIONS * 1000
+        print(f"{name:<28} {per_call:8.3f} ms/payload  {baseline / total:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure event-loop lag while database work runs directly on the loop versus
+through AsyncDatabase's worker thread.
+
+Against a real Postgres (DB_* environment variables), each query sleeps
+server-side with pg_sleep to stand in for a slow database:
+
+    uv run python benchmarks/bench_loop_lag.py --queries 20 --query-ms 50
+
+With --simulate no database is needed and the blocking call is a time.sleep.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from psycopg2 import extensions  # noqa: E402
+
+from app.database.connection import AsyncDatabase, connect_from_env  # noqa: E402
+from utils.loop_lag import LoopLagMonitor  # noqa: E402
+
+
+class _SimulatedConnection:
+    closed = 0
+
+    def __init__(self):
+        self.cursor_obj = _SimulatedCursor()
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        pass
+
+
+class _SimulatedCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def execute(self, query, params=None):
+        time.sleep(params[0])
+
+    def close(self):
+        pass
+
+
+def slow_query(conn, cursor, seconds: float) -> None:
+    cursor.execute("SELECT pg_sleep(%s)", (seconds,))
+
+
+async def measure(name: str, connect, queries: int, seconds: float, off_loop: bool) -> None:
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=float("inf"))
+    monitor.start()
+
+    if off_loop:
+        async with AsyncDatabase(connect=connect) as db:
+            for _ in range(queries):
+                await db.run(slow_query, seconds)
+    else:
+        conn = connect()
+        cursor = conn.cursor()
+        for _ in range(queries):
+            slow_query(conn, cursor, seconds)
+            # Yield like the tracker does between responses
+            await asyncio.sleep(0)
+        cursor.close()
+        conn.close()
+
+    await monitor.stop()
+    stats = monitor.snapshot()
+    print(f"{name:<32} max lag {stats['max_ms']:8.1f} ms   avg lag {stats['avg_ms']:7.2f} ms   "
+          f"samples {stats['samples']}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--query-ms", type=float, default=50)
+    parser.add_argument("--simulate", action="store_true", help="use time.sleep instead of Postgres")
+    args = parser.parse_args()
+
+    connect = _SimulatedConnection if args.simulate else connect_from_env
+    seconds = args.query_ms / 1000
+    print(f"{args.queries} queries of {args.query_ms:.0f} ms each\n")
+    await measure("before: psycopg2 on the loop", connect, args.queries, seconds, off_loop=False)
+    await measure("after: AsyncDatabase", connect, args.queries, seconds, off_loop=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Compare peak memory and CPU of decoding Henrik v4 match payloads in full versus
+projecting them down to the fields MatchStats needs.
+
+Every decoded response is kept alive until the end, like a tick with that many
+player payloads in flight at once.
+
+    uv run python benchmarks/bench_match_projection.py --count 1000
+
+Sample run (656 KiB payloads, tracemalloc enabled so timings are inflated):
+
+    250 payloads   full decode                peak 658.3 MiB   33.3 ms/payload
+                   full decode + project      peak  13.5 MiB   26.5 ms/payload
+                   msgspec typed projection   peak   3.1 MiB    0.8 ms/payload
+    1000 payloads  full decode                killed (out of memory on a 6 GiB machine)
+                   full decode + project      peak  23.2 MiB   29.1 ms/payload
+                   msgspec typed projection   peak  12.3 MiB    0.8 ms/payload
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from henrik_payloads import build_match_response  # noqa: E402
+from app.models import henrik  # noqa: E402
+from utils.decoding import get_json_decoder  # noqa: E402
+
+DISTINCT_PAYLOADS = 20
+
+
+def measure(name, decode, bodies, count):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = [decode(bodies[index % len(bodies)]) for index in range(count)]
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    print(f"{name:<34} peak {peak / 2 ** 20:9.1f} MiB   {elapsed / count * 1000:7.3f} ms/payload")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="number of player payloads held at once")
+    parser.add_argument("--skip-full", action="store_true",
+                        help="skip the full decode, which needs ~3 GiB per 1000 payloads")
+    args = parser.parse_args()
+
+    bodies = [json.dumps(build_match_response(seed=seed)).encode() for seed in range(DISTINCT_PAYLOADS)]
+    print(f"{args.count} payloads of ~{len(bodies[0]) / 1024:.0f} KiB each\n")
+
+    full_decoder = get_json_decoder()
+    if not args.skip_full:
+        measure("full decode", full_decoder, bodies, args.count)
+    measure("full decode + project", lambda body: henrik.project_match_response(full_decoder(body)),
+            bodies, args.count)
+    if henrik.msgspec is not None:
+        measure("msgspec typed projection", henrik.decode_match_response, bodies, args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare commits and write latency for one tick's match stats written with a
+commit per row versus staged in a UnitOfWork and committed once.
+
+Needs a local Postgres reachable through the DB_* environment variables,
+rows go into a scratch schema that is dropped afterwards:
+
+    uv run python benchmarks/bench_unit_of_work.py --rows 2000 --batch-size 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.database.connection import connect_from_env  # noqa: E402
+from app.database.migrations import migrate  # noqa: E402
+from app.database.tables import MatchStatsTable, UnitOfWork  # noqa: E402
+from bench_copy_load import build_rows, legacy_insert  # noqa: E402
+
+SCHEMA = "bench_unit_of_work"
+
+
+def reset(conn, cursor) -> None:
+    cursor.execute("TRUNCATE match_stats CASCADE")
+    conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.seed)
+    conn = connect_from_env()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        conn.commit()
+        migrate(conn, cursor)
+
+        reset(conn, cursor)
+        table = MatchStatsTable(conn, cursor)
+        started = time.perf_counter()
+        for row in rows:
+            legacy_insert(table, row)
+        elapsed = time.perf_counter() - started
+        print(f"{'before: commit per row':<28} {len(rows):>6} rows {len(rows):>6} commits {elapsed * 1000:10.1f} ms")
+
+        reset(conn, cursor)
+        work = UnitOfWork(conn, cursor)
+        table = work.table(MatchStatsTable)
+        started = time.perf_counter()
+        for start in range(0, len(rows), args.batch_size):
+            table.insert_many(rows[start:start + args.batch_size])
+        work.commit()
+        elapsed = time.perf_counter() - started
+        stats = work.stats()
+        print(f"{'after: UnitOfWork':<28} {len(rows):>6} rows {stats['commits']:>6} commits {elapsed * 1000:10.1f} ms"
+              f"  (commit {stats['commit_ms']} ms, {stats['savepoints']} savepoints)")
+    finally:
+        conn.rollback()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
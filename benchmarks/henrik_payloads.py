@@ -0,0 +1,141 @@
+"""Synthetic Henrik API v4 match payloads shaped like real competitive matches"""
+import random
+import uuid
+from typing import Any, Dict, List
+
+AGENTS = ["Jett", "Sova", "Omen", "Killjoy", "Raze", "Sage", "Reyna", "Viper", "Skye", "Fade"]
+MAPS = ["Ascent", "Bind", "Haven", "Split", "Lotus", "Sunset", "Icebox"]
+WEAPONS = ["Vandal", "Phantom", "Operator", "Sheriff", "Spectre", "Ghost", "Classic"]
+
+
+def _player_ref(player: Dict[str, Any]) -> Dict[str, Any]:
+    return {"puuid": player["puuid"], "name": player["name"], "tag": player["tag"], "team": player["team_id"]}
+
+
+def build_player(index: int, rng: random.Random) -> Dict[str, Any]:
+    """One entry of match.players with every field the v4 API returns"""
+    return {
+        "puuid": str(uuid.UUID(int=rng.getrandbits(128))),
+        "name": f"Player{index}",
+        "tag": f"T{index:03d}",
+        "team_id": "Red" if index < 5 else "Blue",
+        "platform": "pc",
+        "party_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "agent": {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": AGENTS[index]},
+        "stats": {
+            "score": rng.randint(2000, 8000),
+            "kills": rng.randint(5, 30),
+            "deaths": rng.randint(5, 25),
+            "assists": rng.randint(0, 15),
+            "headshots": rng.randint(5, 40),
+            "legshots": rng.randint(0, 10),
+            "bodyshots": rng.randint(20, 90),
+            "damage": {"dealt": rng.randint(1500, 5000), "received": rng.randint(1500, 5000)},
+        },
+        "ability_casts": {"grenade": rng.randint(0, 30), "ability1": rng.randint(0, 30),
+                          "ability2": rng.randint(0, 30), "ultimate": rng.randint(0, 5)},
+        "tier": {"id": rng.randint(3, 27), "name": "Diamond 2"},
+        "customization": {"card": str(uuid.UUID(int=rng.getrandbits(128))),
+                          "title": str(uuid.UUID(int=rng.getrandbits(128))),
+                          "preferred_level_border": None},
+        "account_level": rng.randint(20, 500),
+        "session_playtime_in_ms": rng.randint(1_500_000, 3_000_000),
+        "behavior": {"afk_rounds": 0, "friendly_fire": {"incoming": 0, "outgoing": 0}, "rounds_in_spawn": 0},
+        "economy": {"spent": {"overall": rng.randint(50000, 90000), "average": rng.randint(2000, 4000)},
+                    "loadout_value": {"overall": rng.randint(60000, 100000), "average": rng.randint(3000, 4500)}},
+    }
+
+
+def build_round(round_index: int, players: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    """One entry of match.rounds, including per-player round stats and damage events"""
+    return {
+        "id": round_index,
+        "result": "Elimination",
+        "ceremony": "CeremonyDefault",
+        "winning_team": rng.choice(["Red", "Blue"]),
+        "plant": None,
+        "defuse": None,
+        "stats": [
+            {
+                "player": _player_ref(player),
+                "ability_casts": {"grenade": 1, "ability_1": 0, "ability_2": 1, "ultimate": 0},
+                "damage_events": [
+                    {"player": _player_ref(rng.choice(players)), "bodyshots": rng.randint(0, 4),
+                     "headshots": rng.randint(0, 2), "legshots": rng.randint(0, 1), "damage": rng.randint(10, 160)}
+                    for _ in range(rng.randint(1, 4))
+                ],
+                "stats": {"score": rng.randint(0, 600), "kills": rng.randint(0, 3), "headshots": rng.randint(0, 3),
+                          "bodyshots": rng.randint(0, 8), "legshots": rng.randint(0, 2)},
+                "economy": {"loadout_value": rng.randint(800, 5000),
+                            "weapon": {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": rng.choice(WEAPONS),
+                                       "type": "Weapon"},
+                            "armor": {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": "Heavy Shields"},
+                            "remaining": rng.randint(0, 9000)},
+                "was_afk": False,
+                "received_penalty": False,
+                "stayed_in_spawn": False,
+            }
+            for player in players
+        ],
+    }
+
+
+def build_kill(round_index: int, players: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    """One entry of match.kills, including the position of every player at the time of the kill"""
+    killer, victim = rng.sample(players, 2)
+    return {
+        "time_in_round_in_ms": rng.randint(0, 100_000),
+        "time_in_match_in_ms": rng.randint(0, 2_500_000),
+        "round": round_index,
+        "killer": _player_ref(killer),
+        "victim": _player_ref(victim),
+        "assistants": [_player_ref(rng.choice(players)) for _ in range(rng.randint(0, 2))],
+        "location": {"x": rng.randint(-9000, 9000), "y": rng.randint(-9000, 9000)},
+        "weapon": {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": rng.choice(WEAPONS), "type": "Weapon"},
+        "secondary_fire_mode": False,
+        "player_locations": [
+            {"player": _player_ref(player), "view_radians": rng.random() * 6.28,
+             "location": {"x": rng.randint(-9000, 9000), "y": rng.randint(-9000, 9000)}}
+            for player in players
+        ],
+    }
+
+
+def build_match_response(seed: int = 0, rounds: int = 24, kills_per_round: int = 7) -> Dict[str, Any]:
+    """
+    Build the body of GET /valorant/v4/matches/{region}/pc/{name}/{tag}?size=1.
+    """
+    rng = random.Random(seed)
+    players = [build_player(index, rng) for index in range(10)]
+    red_won = rng.randint(0, 1) == 1
+    match = {
+        "metadata": {
+            "match_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "map": {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": rng.choice(MAPS)},
+            "game_version": "release-09.07-shipping-12-2775386",
+            "game_length_in_ms": rng.randint(1_800_000, 3_000_000),
+            "started_at": "2024-10-16T20:15:12.000Z",
+            "is_completed": True,
+            "queue": {"id": "competitive", "name": "Competitive", "mode_type": "Standard"},
+            "season": {"id": str(uuid.UUID(int=rng.getrandbits(128))), "short": "e9a3"},
+            "platform": "pc",
+            "premier": None,
+            "party_rr_penaltys": [],
+            "region": "na",
+            "cluster": "Virginia",
+        },
+        "players": players,
+        "observers": [],
+        "coaches": [],
+        "teams": [
+            {"team_id": "Red",
+             "rounds": {"won": 13 if red_won else rounds - 13, "lost": rounds - 13 if red_won else 13},
+             "won": red_won, "premier_roster": None},
+            {"team_id": "Blue",
+             "rounds": {"won": rounds - 13 if red_won else 13, "lost": 13 if red_won else rounds - 13},
+             "won": not red_won, "premier_roster": None},
+        ],
+        "rounds": [build_round(index, players, rng) for index in range(rounds)],
+        "kills": [build_kill(index // kills_per_round, players, rng) for index in range(rounds * kills_per_round)],
+    }
+    return {"status": 200, "data": [match]}
@@ -1,13 +1,13 @@
 """Discord bot for Valorant tracker commands"""
 import discord
 from discord.ext import commands
-import psycopg2
 import os
 import logging
 from dotenv import load_dotenv
 
 from app.models.player import Player
 from app.database.tables import PlayersTable
+from app.database.connection import AsyncDatabase, get_database
 
 # Load environment variables
 load_dotenv()
@@ -24,50 +24,59 @@ intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
 
+# Henrik API regions, accounts are added in DEFAULT_REGION unless another one is given
+REGIONS = ("na", "eu", "ap", "kr", "latam", "br")
+DEFAULT_REGION = "na"
+
 
 class DatabaseConnection:
-    """Context manager for database connections"""
+    """
+    Async context manager yielding the shared pooled database, queries run off the event loop.
+    Falls back to a one-off connection when the bot runs without the shared pool.
+    """
+
     def __init__(self):
-        self.conn = None
-        self.cursor = None
-
-    def __enter__(self):
-        self.conn = psycopg2.connect(
-            dbname=os.getenv("DB_NAME", "valorant"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST", "localhost"),
-            port=os.getenv("DB_PORT", "5432"),
-        )
-        self.cursor = self.conn.cursor()
-        return self.conn, self.cursor
+        self.db = None
+        self._owned = False
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+    async def __aenter__(self) -> AsyncDatabase:
+        self.db = get_database()
+        if self.db is None:
+            self.db = AsyncDatabase()
+            self._owned = True
+            await self.db.connect()
+        return self.db
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._owned:
+            await self.db.close()
 
 
 @bot.command(name='tracker')
-async def tracker(ctx, action: str = None, player_identifier: str = None):
+async def tracker(ctx, action: str = None, player_identifier: str = None, region: str = DEFAULT_REGION):
     """
     Tracker command to manage player tracking.
 
     Usage:
-        !tracker add <username>#<tag>
-        !tracker remove <username>#<tag>
+        !tracker add <username>#<tag> [region]
+        !tracker remove <username>#<tag> [region]
     """
     if action is None:
         await ctx.send(
             "**Valorant Tracker Bot**\n"
             "Usage:\n"
-            "`!tracker add <username>#<tag>` - Start tracking a player\n"
-            "`!tracker remove <username>#<tag>` - Stop tracking a player\n"
-            "`!tracker list` - Show all players you're tracking"
+            "`!tracker add <username>#<tag> [region]` - Start tracking a player\n"
+            "`!tracker remove <username>#<tag> [region]` - Stop tracking a player\n"
+            "`!tracker list` - Show all players you're tracking\n"
+            f"Regions: {', '.join(REGIONS)} (default {DEFAULT_REGION})"
         )
         return
 
+    region = region.lower()
+    if region not in REGIONS:
+        await ctx.send(f"❌ Unknown region `{region}`. Use one of: {', '.join(REGIONS)}")
+        return
+
     if action.lower() == 'add':
         if player_identifier is None:
             await ctx.send("❌ Please provide a player name in the format: `username#tag`")
@@ -98,9 +107,8 @@ async def tracker(ctx, action: str = None, player_identifier: str = None):
             )
 
             # Insert into database
-            with DatabaseConnection() as (conn, cursor):
-                players_table = PlayersTable(conn, cursor)
-                success = players_table.insert(player)
+            async with DatabaseConnection() as db:
+                success = await db.table(PlayersTable).insert(player, region)
 
                 if success:
                     await ctx.send(
@@ -108,7 +116,7 @@ async def tracker(ctx, action: str = None, player_identifier: str = None):
                         f"Discord User: <@{discord_id}>\n"
                         f"You will receive notifications when new matches are detected."
                     )
-                    logger.info(f"Added player {username}#{tag} for Discord user {discord_id}")
+                    logger.info(f"Added player {username}#{tag} ({region}) for Discord user {discord_id}")
                 else:
                     await ctx.send(
                         f"ℹ️ **{username}#{tag}** is already being tracked.\n"
@@ -125,16 +133,12 @@ async def tracker(ctx, action: str = None, player_identifier: str = None):
         try:
             discord_id = ctx.author.id
 
-            with DatabaseConnection() as (conn, cursor):
-                cursor.execute(
-                    "SELECT username, tag FROM players WHERE discord_id = %s ORDER BY created_at",
-                    (discord_id,)
-                )
-                players = cursor.fetchall()
+            async with DatabaseConnection() as db:
+                players = await db.table(PlayersTable).find_by_discord_id(discord_id)
 
                 if players:
                     player_list = "\n".join(
-                        f"• **{username}#{tag}**" for username, tag in players
+                        f"• **{username}#{tag}** ({region.upper()})" for username, tag, region in players
                     )
                     await ctx.send(
                         f"**Tracked Players ({len(players)}):**\n{player_list}"
@@ -169,15 +173,16 @@ async def tracker(ctx, action: str = None, player_identifier: str = None):
 
             discord_id = ctx.author.id
 
-            with DatabaseConnection() as (conn, cursor):
-                players_table = PlayersTable(conn, cursor)
-                success = players_table.delete(username=username, tag=tag, discord_id=discord_id)
+            async with DatabaseConnection() as db:
+                success = await db.table(PlayersTable).delete(
+                    username=username, tag=tag, region=region, discord_id=discord_id
+                )
 
                 if success:
                     await ctx.send(
                         f"✅ Successfully removed **{username}#{tag}** from tracking."
                     )
-                    logger.info(f"Removed player {username}#{tag} for Discord user {discord_id}")
+                    logger.info(f"Removed player {username}#{tag} ({region}) for Discord user {discord_id}")
                 else:
                     await ctx.send(
                         f"ℹ️ **{username}#{tag}** is not currently being tracked."
@@ -0,0 +1,218 @@
+"""Database connections and an executor-backed async adapter for psycopg2"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Type, TypeVar
+import logging
+
+import psycopg2
+
+from app.database.pool import ConnectionPool
+from app.database.tables import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def connect_from_env():
+    """
+    Open a psycopg2 connection using the DB_* environment variables.
+    """
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME", "valorant"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+    )
+
+
+class AsyncDatabase:
+    """
+    Runs blocking psycopg2 work on worker threads so the event loop
+    (and the Discord gateway running on it) never waits on Postgres.
+    Each call checks a connection out of the pool for its duration.
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, connect: Callable[[], Any] = connect_from_env):
+        # Without a shared pool, fall back to a private single connection that is closed with this adapter
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else ConnectionPool(connect, max_size=1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def __aenter__(self) -> 'AsyncDatabase':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """Start the worker threads, one per pooled connection"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool.max_size, thread_name_prefix="db")
+
+    async def close(self) -> None:
+        """Stop the worker threads, and close the pool if this adapter created it"""
+        if self._executor is None:
+            return
+
+        try:
+            if self._owns_pool:
+                await self._submit(self.pool.close)
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run func(conn, cursor, *args, **kwargs) on a worker thread and return its result.
+        """
+        def _run():
+            # psycopg2 cursors must not be shared across threads, so each call gets its own
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    return func(conn, cursor, *args, **kwargs)
+
+        return await self._submit(_run)
+
+    def table(self, table_cls: Type) -> 'AsyncTable':
+        """Return an awaitable facade over a Table class bound to this database"""
+        return AsyncTable(self, table_cls)
+
+    def bind_table(self, table_cls: Type, conn, cursor) -> Any:
+        """Instantiate a Table class for one call, each write commits on its own"""
+        return table_cls(conn, cursor)
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator['AsyncUnitOfWork']:
+        """
+        Hold one pooled connection for a series of calls that are committed together when the
+        block exits cleanly, or rolled back if it raises.
+        """
+        conn = await self._submit(self.pool.getconn)
+        work = AsyncUnitOfWork(self, conn)
+        discard = False
+        try:
+            yield work
+            await work.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # The connection itself is likely broken, don't hand it to anyone else
+            discard = True
+            raise
+        finally:
+            def _release():
+                try:
+                    work.work.cursor.close()
+                finally:
+                    # Returning the connection rolls back anything uncommitted
+                    self.pool.putconn(conn, discard=discard or bool(conn.closed))
+
+            await self._submit(_release)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the pool's connection counters"""
+        return self.pool.stats()
+
+    async def _submit(self, func: Callable[[], T]) -> T:
+        if self._executor is None:
+            raise RuntimeError("AsyncDatabase is not connected")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func)
+
+
+class AsyncUnitOfWork:
+    """
+    Awaitable wrapper around a UnitOfWork pinned to one pooled connection.
+    Tables from `table()` stage their writes in it instead of committing per call.
+    """
+
+    def __init__(self, db: AsyncDatabase, conn):
+        self.db = db
+        self.work = UnitOfWork(conn, conn.cursor())
+        # Calls share one connection, so they must not overlap
+        self._lock = asyncio.Lock()
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run func(conn, cursor, *args, **kwargs) inside the unit of work and return its result.
+        """
+        async with self._lock:
+            return await self.db._submit(lambda: func(self.work.conn, self.work.cursor, *args, **kwargs))
+
+    def table(self, table_cls: Type) -> 'AsyncTable':
+        """Return an awaitable facade over a Table class whose writes are staged in this unit of work"""
+        return AsyncTable(self, table_cls)
+
+    def bind_table(self, table_cls: Type, conn, cursor) -> Any:
+        return self.work.table(table_cls)
+
+    async def commit(self) -> None:
+        """Commit everything staged so far"""
+        async with self._lock:
+            await self.db._submit(self.work.commit)
+
+    async def rollback(self) -> None:
+        """Discard everything staged so far"""
+        async with self._lock:
+            await self.db._submit(self.work.rollback)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return transaction counters for the tick report"""
+        return self.work.stats()
+
+
+class AsyncTable:
+    """
+    Awaitable facade over a Table class, e.g. `await db.table(PlayersTable).insert(player)`.
+    Every method call runs on one of the database's worker threads.
+    """
+
+    def __init__(self, db, table_cls: Type):
+        self.db = db
+        self.table_cls = table_cls
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if not callable(getattr(self.table_cls, name, None)):
+            raise AttributeError(f"{self.table_cls.__name__} has no method {name}")
+
+        async def call(*args, **kwargs):
+            return await self.db.run(
+                lambda conn, cursor: getattr(self.db.bind_table(self.table_cls, conn, cursor), name)(*args, **kwargs)
+            )
+
+        return call
+
+
+# Process-wide database shared by the tracker job and the bot commands
+_database: Optional[AsyncDatabase] = None
+
+
+async def start_database(connect: Callable[[], Any] = connect_from_env, **pool_kwargs) -> AsyncDatabase:
+    """
+    Start the process-wide connection pool and database adapter.
+    """
+    global _database
+    if _database is None:
+        _database = AsyncDatabase(ConnectionPool(connect, **pool_kwargs))
+    await _database.connect()
+    return _database
+
+
+async def close_database() -> None:
+    """
+    Close the process-wide database and every pooled connection.
+    """
+    global _database
+    if _database is not None:
+        database, _database = _database, None
+        await database.close()
+        await asyncio.get_running_loop().run_in_executor(None, database.pool.close)
+
+
+def get_database() -> Optional[AsyncDatabase]:
+    """
+    Return the process-wide database, or None if it has not been started.
+    """
+    return _database
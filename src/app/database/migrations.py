@@ -0,0 +1,260 @@
+"""Versioned schema migrations, applied once at startup"""
+from typing import Callable, Dict, List, NamedTuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock, so only one process migrates at a time
+MIGRATION_LOCK_ID = 4_810_221_903
+
+# The tracker polled every player in this region before accounts stored their own
+LEGACY_REGION = "na"
+
+
+class Migration(NamedTuple):
+    """One numbered schema change"""
+    version: int
+    description: str
+    apply: Callable
+    # Statements such as CREATE INDEX CONCURRENTLY can't run inside a transaction
+    transactional: bool = True
+
+
+MIGRATIONS: Dict[int, Migration] = {}
+
+
+def migration(version: int, description: str, transactional: bool = True) -> Callable:
+    """
+    Register func(cursor) as schema migration `version`.
+    Versions are applied in ascending order and must never be renumbered once released.
+    """
+    def register(func: Callable) -> Callable:
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS[version] = Migration(version, description, func, transactional)
+        return func
+
+    return register
+
+
+@migration(1, "Create players and match_stats tables")
+def _create_tables(cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS players (
+            username VARCHAR(255) NOT NULL,
+            tag VARCHAR(255) NOT NULL,
+            discord_id BIGINT NOT NULL,
+            hash VARCHAR(16) UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS match_stats (
+            match_id VARCHAR(16) PRIMARY KEY,
+            player_name VARCHAR(255) NOT NULL,
+            player_tag VARCHAR(255) NOT NULL,
+            agent VARCHAR(100),
+            game_score VARCHAR(20),
+            kills INT,
+            deaths INT,
+            assists INT,
+            kd_ratio FLOAT,
+            damage_delta INT,
+            headshot_percentage FLOAT,
+            adr FLOAT,
+            acs FLOAT,
+            team_placement INT,
+            map_name VARCHAR(100),
+            match_result VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+@migration(2, "Add a 64-bit match_key column alongside the hex match_id")
+def _add_bigint_keys(cursor) -> None:
+    # Dual-write period: new rows get both keys, legacy rows get their hex match_id reinterpreted as a BIGINT.
+    # That won't equal the BLAKE2b key of the same match, but match_id stays unique meanwhile,
+    # so ON CONFLICT still catches a legacy row written again.
+    cursor.execute("ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS match_key BIGINT")
+    cursor.execute("UPDATE match_stats SET match_key = ('x' || match_id)::bit(64)::bigint WHERE match_key IS NULL")
+
+
+@migration(3, "Unique index on match_stats.match_key", transactional=False)
+def _index_match_key(cursor) -> None:
+    cursor.execute(
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS match_stats_match_key_idx ON match_stats (match_key)"
+    )
+
+
+@migration(4, "Split players into tracked_accounts and subscriptions")
+def _normalize_players(cursor) -> None:
+    # One row per Riot account with a small surrogate id, polling and fan-out key on it.
+    # Names are unique case-insensitively like Riot IDs, puuid stays NULL until it's resolved from the API.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tracked_accounts (
+            id INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            puuid VARCHAR(78) UNIQUE,
+            region VARCHAR(10) NOT NULL,
+            username VARCHAR(255) NOT NULL,
+            tag VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Also serves the bot's add and remove lookups, which match on LOWER(username), LOWER(tag) and region
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS tracked_accounts_name_idx
+        ON tracked_accounts (LOWER(username), LOWER(tag), region)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            account_id INT NOT NULL REFERENCES tracked_accounts (id) ON DELETE CASCADE,
+            discord_id BIGINT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (account_id, discord_id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS subscriptions_discord_id_idx ON subscriptions (discord_id)")
+
+    # Copy the existing players rows over, the players table itself is left in place for now.
+    # tracked_accounts is new, so every account in it at this point is one of these, all in LEGACY_REGION.
+    # Case variants become one account, spelled with the variant lowest in codepoint order. Matches stored
+    # under the other spellings are deduplicated against that spelling by the next migration.
+    cursor.execute("""
+        INSERT INTO tracked_accounts (username, tag, region, created_at)
+        SELECT DISTINCT ON (LOWER(username), LOWER(tag))
+            username, tag, %s, MIN(created_at) OVER (PARTITION BY LOWER(username), LOWER(tag))
+        FROM players
+        ORDER BY LOWER(username), LOWER(tag), username COLLATE "C", tag COLLATE "C"
+        ON CONFLICT DO NOTHING
+    """, (LEGACY_REGION,))
+    cursor.execute("""
+        INSERT INTO subscriptions (account_id, discord_id, created_at)
+        SELECT accounts.id, players.discord_id, MIN(players.created_at)
+        FROM players
+        JOIN tracked_accounts accounts
+            ON LOWER(accounts.username) = LOWER(players.username)
+            AND LOWER(accounts.tag) = LOWER(players.tag)
+        GROUP BY accounts.id, players.discord_id
+        ON CONFLICT DO NOTHING
+    """)
+
+    cursor.execute("ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS account_id INT REFERENCES tracked_accounts (id)")
+    cursor.execute("""
+        UPDATE match_stats SET account_id = accounts.id
+        FROM tracked_accounts accounts
+        WHERE match_stats.account_id IS NULL
+            AND LOWER(accounts.username) = LOWER(match_stats.player_name)
+            AND LOWER(accounts.tag) = LOWER(match_stats.player_tag)
+    """)
+
+
+@migration(5, "Remove match_stats rows duplicated across spellings of one account")
+def _dedupe_case_variant_matches(cursor) -> None:
+    # Before accounts were case-insensitive, Foo#NA1 and foo#na1 were polled separately and stored the same
+    # match twice under different hashes. The API match id isn't stored, so duplicates are identified by the
+    # account plus the full stat line. The row kept is the one spelled like the account, its match_id is the
+    # hash the tracker computes for that match now, so the match isn't detected (and notified) as new again.
+    cursor.execute("""
+        DELETE FROM match_stats
+        WHERE match_id IN (
+            SELECT match_id FROM (
+                SELECT stats.match_id, ROW_NUMBER() OVER (
+                    PARTITION BY stats.account_id, stats.map_name, stats.agent, stats.game_score,
+                        stats.kills, stats.deaths, stats.assists, stats.damage_delta,
+                        stats.headshot_percentage, stats.adr, stats.acs, stats.team_placement
+                    ORDER BY (stats.player_name = accounts.username AND stats.player_tag = accounts.tag) DESC,
+                        stats.created_at, stats.match_id
+                ) AS copy
+                FROM match_stats stats
+                JOIN tracked_accounts accounts ON accounts.id = stats.account_id
+            ) copies
+            WHERE copy > 1
+        )
+    """)
+    logger.info(f"Removed {cursor.rowcount} duplicate match_stats rows")
+
+
+@migration(6, "Create the notification outbox")
+def _create_outbox(cursor) -> None:
+    # One row per (match, subscriber), queued in the same statement as the match itself and delivered
+    # by the outbox worker. available_at doubles as the retry schedule and the claim lease, and
+    # notifications that will never go out are parked at 'infinity' with their last error.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            match_key BIGINT NOT NULL REFERENCES match_stats (match_key) ON DELETE CASCADE,
+            discord_id BIGINT NOT NULL,
+            attempts INT NOT NULL DEFAULT 0,
+            available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            delivered_at TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (match_key, discord_id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS outbox_pending_idx ON outbox (available_at) WHERE delivered_at IS NULL")
+
+
+def current_version(cursor) -> int:
+    """Return the highest applied migration version, 0 for a fresh database"""
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn, cursor) -> List[int]:
+    """
+    Apply every pending migration in order and return the versions applied.
+    Runs under a session advisory lock so concurrent startups don't race,
+    each transactional migration commits together with its schema_version row.
+    """
+    cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+
+        version = current_version(cursor)
+        applied = []
+        for pending in sorted(v for v in MIGRATIONS if v > version):
+            _apply(conn, cursor, MIGRATIONS[pending])
+            applied.append(pending)
+
+        conn.commit()
+        if applied:
+            logger.info(f"Applied schema migrations {applied}, database is at version {applied[-1]}")
+        else:
+            logger.info(f"Database schema is up to date at version {version}")
+        return applied
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+
+
+def _apply(conn, cursor, pending: Migration) -> None:
+    logger.info(f"Applying schema migration {pending.version}: {pending.description}")
+    if pending.transactional:
+        pending.apply(cursor)
+    else:
+        # psycopg2 only allows switching to autocommit outside a transaction
+        conn.commit()
+        conn.autocommit = True
+        try:
+            pending.apply(cursor)
+        finally:
+            conn.autocommit = False
+
+    cursor.execute(
+        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+        (pending.version, pending.description)
+    )
+    conn.commit()
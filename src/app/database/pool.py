@@ -0,0 +1,200 @@
+"""Bounded psycopg2 connection pool shared by the tracker and the bot"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+import logging
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """No connection became available within the checkout timeout"""
+
+
+class _PooledConnection:
+    """A pooled connection and the timestamps used to decide when to check or recycle it"""
+
+    __slots__ = ("conn", "created_at", "last_used_at")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most max_size connections.
+    Connections idle for longer than health_check_after are pinged before reuse,
+    and connections older than max_lifetime are closed and replaced.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 5,
+        max_lifetime: float = 30 * 60,
+        health_check_after: float = 30.0,
+        checkout_timeout: float = 10.0
+    ):
+        self._connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+        self._idle: Deque[_PooledConnection] = deque()
+        self._checked_out: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        self._stats = {
+            "opened": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "health_check_failures": 0
+        }
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Check a connection out for the duration of the block.
+        Uncommitted work is rolled back when it's returned.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # The connection itself is likely broken, don't hand it to anyone else
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard)
+
+    def getconn(self) -> Any:
+        """Check a connection out, it must be handed back through putconn"""
+        pooled = self._checkout()
+        with self._lock:
+            self._checked_out[id(pooled.conn)] = pooled
+        return pooled.conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Return a connection from getconn, rolling back anything uncommitted"""
+        with self._lock:
+            pooled = self._checked_out.pop(id(conn))
+        self._checkin(pooled, discard)
+
+    def close(self) -> None:
+        """Close every idle connection, checked-out ones are closed when they come back"""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                self._close(self._idle.popleft())
+            self._lock.notify_all()
+        logger.info(f"Connection pool closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool size and connection churn counters"""
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                **self._stats
+            }
+
+    def _checkout(self) -> _PooledConnection:
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            pooled = self._reserve(deadline)
+            if pooled is None:
+                break
+            # Idle connections are validated outside the lock so a slow ping doesn't stall other checkouts
+            if self._usable(pooled):
+                with self._lock:
+                    self._stats["checkouts"] += 1
+                return pooled
+            with self._lock:
+                self._close(pooled)
+                self._lock.notify()
+
+        try:
+            pooled = _PooledConnection(self._connect())
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+        with self._lock:
+            self._stats["opened"] += 1
+            self._stats["checkouts"] += 1
+        return pooled
+
+    def _reserve(self, deadline: float) -> Optional[_PooledConnection]:
+        """Take an idle connection, or return None once a slot for a new one is reserved"""
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(f"No database connection available after {self.checkout_timeout}s")
+                self._lock.wait(remaining)
+
+    def _checkin(self, pooled: _PooledConnection, discard: bool = False) -> None:
+        conn = pooled.conn
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        with self._lock:
+            pooled.last_used_at = time.monotonic()
+            if discard or conn.closed or self._closed or self._expired(pooled):
+                self._close(pooled)
+            else:
+                self._idle.append(pooled)
+            self._lock.notify()
+
+    def _usable(self, pooled: _PooledConnection) -> bool:
+        """Ping connections that have been idle for a while before handing them out"""
+        if pooled.conn.closed or self._expired(pooled):
+            return False
+        if time.monotonic() - pooled.last_used_at < self.health_check_after:
+            return True
+
+        try:
+            with pooled.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            pooled.conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            with self._lock:
+                self._stats["health_check_failures"] += 1
+            logger.warning(f"Discarding unhealthy pooled connection: {e}")
+            return False
+
+    def _expired(self, pooled: _PooledConnection) -> bool:
+        return time.monotonic() - pooled.created_at >= self.max_lifetime
+
+    def _close(self, pooled: _PooledConnection) -> None:
+        """Called with the lock held"""
+        self._size -= 1
+        self._stats["closed"] += 1
+        try:
+            pooled.conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
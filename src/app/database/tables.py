@@ -1,46 +1,102 @@
 """Database table abstractions for clean ORM-like operations"""
+import itertools
+import time
 import psycopg2
-from typing import Optional, Dict, Any, List
+from psycopg2.extras import execute_values
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Sequence
 from pydantic import BaseModel
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def create_tables(conn, cursor) -> None:
-    """Create tables if they don't exist"""
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS players (
-            username VARCHAR(255) NOT NULL,
-            tag VARCHAR(255) NOT NULL,
-            discord_id BIGINT NOT NULL,
-            hash VARCHAR(16) UNIQUE NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS match_stats (
-            match_id VARCHAR(16) PRIMARY KEY,
-            player_name VARCHAR(255) NOT NULL,
-            player_tag VARCHAR(255) NOT NULL,
-            agent VARCHAR(100),
-            game_score VARCHAR(20),
-            kills INT,
-            deaths INT,
-            assists INT,
-            kd_ratio FLOAT,
-            damage_delta INT,
-            headshot_percentage FLOAT,
-            adr FLOAT,
-            acs FLOAT,
-            team_placement INT,
-            map_name VARCHAR(100),
-            match_result VARCHAR(20),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    logger.info("Database tables verified/created")
+def _copy_value(value: Any) -> str:
+    """Format one value for COPY's text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _CopyReader:
+    """File-like object COPY FROM STDIN reads from, rows are formatted as they're consumed"""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+class UnitOfWork:
+    """
+    Table writes on one connection, committed together whenever the caller calls commit() instead of per write.
+    Each write runs in its own savepoint, so a failed write only undoes itself.
+    """
+
+    def __init__(self, conn, cursor):
+        self.conn = conn
+        self.cursor = cursor
+        self.commits = 0
+        self.commit_seconds = 0.0
+        self.savepoints = 0
+        self.savepoint_rollbacks = 0
+
+    def table(self, table_cls: type) -> 'Table':
+        """Return a table whose writes are staged in this unit of work"""
+        table = table_cls(self.conn, self.cursor)
+        table.unit_of_work = self
+        return table
+
+    def savepoint(self) -> None:
+        self.cursor.execute("SAVEPOINT table_write")
+        self.savepoints += 1
+
+    def release(self) -> None:
+        self.cursor.execute("RELEASE SAVEPOINT table_write")
+
+    def rollback_to_savepoint(self) -> None:
+        self.cursor.execute("ROLLBACK TO SAVEPOINT table_write")
+        self.cursor.execute("RELEASE SAVEPOINT table_write")
+        self.savepoint_rollbacks += 1
+
+    def commit(self) -> None:
+        """Commit every staged write"""
+        started = time.perf_counter()
+        self.conn.commit()
+        self.commit_seconds += time.perf_counter() - started
+        self.commits += 1
+
+    def rollback(self) -> None:
+        """Discard every staged write"""
+        self.conn.rollback()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return transaction counters for the tick report"""
+        return {
+            "commits": self.commits,
+            "commit_ms": round(self.commit_seconds * 1000, 2),
+            "savepoints": self.savepoints,
+            "savepoint_rollbacks": self.savepoint_rollbacks
+        }
 
 
 class Table:
@@ -50,11 +106,30 @@ class Table:
         self.conn = conn
         self.cursor = cursor
         self.table_name = table_name
+        # Set by UnitOfWork.table, writes are then committed by the unit of work instead of per call
+        self.unit_of_work: Optional[UnitOfWork] = None
+
+    def _begin(self) -> None:
+        if self.unit_of_work is not None:
+            self.unit_of_work.savepoint()
+
+    def _commit(self) -> None:
+        if self.unit_of_work is not None:
+            self.unit_of_work.release()
+        else:
+            self.conn.commit()
+
+    def _rollback(self) -> None:
+        if self.unit_of_work is not None:
+            self.unit_of_work.rollback_to_savepoint()
+        else:
+            self.conn.rollback()
 
     def insert(self, model: BaseModel, on_conflict: Optional[str] = None) -> bool:
         """
         Insert a Pydantic model into the table.
         """
+        self._begin()
         try:
             # Get model data as dict, including computed fields
             data = model.model_dump()
@@ -70,19 +145,113 @@ class Table:
                 query += f" ON CONFLICT {on_conflict}"
 
             self.cursor.execute(query, values)
-            self.conn.commit()
+            self._commit()
 
             return True
 
         except psycopg2.IntegrityError as e:
-            self.conn.rollback()
+            self._rollback()
             logger.debug(f"Integrity error inserting into {self.table_name}: {e}")
             return False
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logger.error(f"Error inserting into {self.table_name}: {e}")
             raise
 
+    def insert_many(
+        self,
+        models: Sequence[BaseModel],
+        on_conflict: Optional[str] = "DO NOTHING",
+        returning: Optional[str] = None,
+        select: Optional[str] = None,
+        page_size: int = 500
+    ) -> List[tuple]:
+        """
+        Insert Pydantic models with multi-row INSERT statements of up to page_size rows each,
+        committing once at the end (or releasing one savepoint inside a unit of work).
+        Returns the RETURNING rows, i.e. the rows actually inserted.
+        With select, the RETURNING rows are exposed to it as the CTE `inserted` and its rows
+        are returned instead, e.g. to join new rows to another table in the same statement.
+        """
+        if not models:
+            return []
+
+        self._begin()
+        try:
+            rows = [model.model_dump() for model in models]
+            columns = list(rows[0].keys())
+
+            query = f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES %s"
+            if on_conflict:
+                query += f" ON CONFLICT {on_conflict}"
+            if returning:
+                query += f" RETURNING {returning}"
+            if select:
+                query = f"WITH inserted AS ({query}) {select}"
+
+            values = [tuple(row[column] for column in columns) for row in rows]
+            result = execute_values(self.cursor, query, values, page_size=page_size, fetch=bool(returning or select))
+            self._commit()
+
+            return result or []
+
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error bulk inserting into {self.table_name}: {e}")
+            raise
+
+    def copy_many(
+        self,
+        models: Iterable[BaseModel],
+        on_conflict: Optional[str] = "DO NOTHING",
+        columns: Optional[List[str]] = None
+    ) -> int:
+        """
+        Bulk load models with COPY FROM STDIN into a temporary staging table, then merge them
+        into this table in one INSERT ... SELECT. Models are streamed, so this suits backfills of any size.
+        Returns the number of rows merged, i.e. not skipped by on_conflict.
+        """
+        models = iter(models)
+        first = next(models, None)
+        if first is None:
+            return 0
+
+        # Read attributes directly rather than model_dump() per row, the same columns it would produce
+        if columns is None:
+            model_fields = type(first).model_fields
+            columns = [name for name, field in model_fields.items() if not field.exclude]
+            columns += list(type(first).model_computed_fields)
+        column_list = ', '.join(columns)
+        staging = f"{self.table_name}_staging"
+
+        def lines() -> Iterator[str]:
+            for model in itertools.chain([first], models):
+                yield '\t'.join(_copy_value(getattr(model, column)) for column in columns) + '\n'
+
+        self._begin()
+        try:
+            self.cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {self.table_name} INCLUDING DEFAULTS) "
+                f"ON COMMIT DELETE ROWS"
+            )
+            self.cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN", _CopyReader(lines()))
+
+            query = f"INSERT INTO {self.table_name} ({column_list}) SELECT {column_list} FROM {staging}"
+            if on_conflict:
+                query += f" ON CONFLICT {on_conflict}"
+            self.cursor.execute(query)
+            merged = self.cursor.rowcount
+            # Empty the staging table straight away in case more is loaded before the commit
+            self.cursor.execute(f"TRUNCATE {staging}")
+            self._commit()
+
+            return merged
+
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error copying into {self.table_name}: {e}")
+            raise
+
     def find_one(self, **conditions) -> Optional[Dict[str, Any]]:
         """
         Find a single row matching conditions.
@@ -103,63 +272,131 @@ class Table:
 
 
 class PlayersTable(Table):
-    """Players table with custom methods"""
+    """Tracked accounts and the Discord users subscribed to them"""
 
     def __init__(self, conn, cursor):
-        super().__init__(conn, cursor, "players")
+        super().__init__(conn, cursor, "tracked_accounts")
 
-    def insert(self, model: BaseModel) -> bool:
+    def insert(self, model: BaseModel, region: str) -> bool:
         """
-        Insert a player into the database.
-        Returns True if player was inserted, False if already exists.
+        Subscribe a player's Discord user to their account in region, creating the account if it's new.
+        Returns True if the subscription was added, False if it already existed.
         """
+        self._begin()
         try:
-            # Get model data as dict, including computed fields
-            data = model.model_dump()
-
-            # Build INSERT query with RETURNING clause to check if row was inserted
-            columns = ', '.join(data.keys())
-            placeholders = ', '.join(['%s'] * len(data))
-            values = tuple(data.values())
-
-            query = f"""
-                INSERT INTO {self.table_name} ({columns}) 
-                VALUES ({placeholders})
-                ON CONFLICT (hash) DO NOTHING
-                RETURNING hash
-            """
-
-            self.cursor.execute(query, values)
+            # The no-op update makes RETURNING yield the id of an account that already exists
+            self.cursor.execute(
+                f"""
+                WITH account AS (
+                    INSERT INTO {self.table_name} (username, tag, region)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (LOWER(username), LOWER(tag), region) DO UPDATE SET region = EXCLUDED.region
+                    RETURNING id
+                )
+                INSERT INTO subscriptions (account_id, discord_id)
+                SELECT id, %s FROM account
+                ON CONFLICT DO NOTHING
+                RETURNING account_id
+                """,
+                (model.username, model.tag, region, model.discord_id)
+            )
             result = self.cursor.fetchone()
-            self.conn.commit()
+            self._commit()
 
-            # If result is None, the row already existed (conflict occurred)
+            # If result is None, the subscription already existed (conflict occurred)
             return result is not None
 
         except psycopg2.IntegrityError as e:
-            self.conn.rollback()
+            self._rollback()
             logger.debug(f"Integrity error inserting into {self.table_name}: {e}")
             return False
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logger.error(f"Error inserting into {self.table_name}: {e}")
             raise
 
-    def delete(self, username: str, tag: str, discord_id: int) -> bool:
+    def find_by_discord_id(self, discord_id: int) -> List[tuple]:
         """
-        Delete a player from tracking.
-        Returns True if a player was deleted, False if not found.
+        Return the (username, tag, region) accounts a Discord user is tracking, oldest first.
         """
+        self.cursor.execute(
+            f"""
+            SELECT accounts.username, accounts.tag, accounts.region
+            FROM subscriptions
+            JOIN {self.table_name} accounts ON accounts.id = subscriptions.account_id
+            WHERE subscriptions.discord_id = %s
+            ORDER BY subscriptions.created_at
+            """,
+            (discord_id,)
+        )
+        return self.cursor.fetchall()
+
+    def tracked_accounts(self) -> List[tuple]:
+        """
+        Return (id, username, tag, region, puuid) for every account with at least one subscriber,
+        puuid is None until the account has been seen in a match.
+        """
+        self.cursor.execute(
+            f"""
+            SELECT id, username, tag, region, puuid FROM {self.table_name} accounts
+            WHERE EXISTS (SELECT 1 FROM subscriptions WHERE subscriptions.account_id = accounts.id)
+            """
+        )
+        return self.cursor.fetchall()
+
+    def resolve_puuids(self, accounts: Sequence[tuple]) -> int:
+        """
+        Store the puuid of accounts that don't have one yet from (account_id, puuid) pairs.
+        A puuid already stored on another account is skipped rather than moved.
+        Returns the number of accounts updated.
+        """
+        if not accounts:
+            return 0
+
+        self._begin()
+        try:
+            execute_values(
+                self.cursor,
+                f"""
+                UPDATE {self.table_name} accounts SET puuid = resolved.puuid
+                FROM (VALUES %s) AS resolved (id, puuid)
+                WHERE accounts.id = resolved.id AND accounts.puuid IS NULL
+                    AND NOT EXISTS (SELECT 1 FROM {self.table_name} other WHERE other.puuid = resolved.puuid)
+                """,
+                accounts,
+                page_size=len(accounts)
+            )
+            updated = self.cursor.rowcount
+            self._commit()
+            return updated
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error resolving puuids in {self.table_name}: {e}")
+            raise
+
+    def delete(self, username: str, tag: str, region: str, discord_id: int) -> bool:
+        """
+        Unsubscribe a Discord user from an account in region, the account stays so its match history is kept.
+        Returns True if a subscription was deleted, False if not found.
+        """
+        self._begin()
         try:
             self.cursor.execute(
-                f"DELETE FROM {self.table_name} WHERE username = %s AND tag = %s AND discord_id = %s RETURNING hash",
-                (username, tag, discord_id)
+                f"""
+                DELETE FROM subscriptions
+                USING {self.table_name} accounts
+                WHERE subscriptions.account_id = accounts.id
+                    AND LOWER(accounts.username) = LOWER(%s) AND LOWER(accounts.tag) = LOWER(%s)
+                    AND accounts.region = %s AND subscriptions.discord_id = %s
+                RETURNING subscriptions.account_id
+                """,
+                (username, tag, region, discord_id)
             )
             result = self.cursor.fetchone()
-            self.conn.commit()
+            self._commit()
             return result is not None
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logger.error(f"Error deleting from {self.table_name}: {e}")
             raise
 
@@ -172,22 +409,174 @@ class MatchStatsTable(Table):
 
     def insert(self, model: BaseModel) -> List[int]:
         """
-        Insert a match stat and return list of discord_ids tracking this player.
-        Returns empty list if match already existed.
+        Insert a match stat, queue a notification for every discord_id subscribed to the player's account
+        and return those discord_ids. Returns empty list if match already existed.
+        """
+        return self.insert_many([model]).get(model.match_key, [])
+
+    def insert_many(self, models: Sequence[BaseModel]) -> Dict[int, List[int]]:
+        """
+        Insert a batch of match stats and return the discord_ids notified for each new match_key.
+        New rows are joined to their account's subscribers and queued in the outbox in the same statement,
+        so a stored match always has its notifications. Matches that already existed are skipped by
+        ON CONFLICT and left out of the result.
+        A batch rejected for bad data is retried row by row, so one bad row doesn't lose the rest.
         """
-        # Try to insert the match
-        success = super().insert(model)
+        try:
+            rows = self._insert_with_subscribers(models)
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            if len(models) == 1:
+                raise
+            # The batch was rolled back as a whole, retry row by row so only the bad rows are lost
+            logger.warning(f"Batch insert into {self.table_name} failed, retrying {len(models)} rows one by one: {e}")
+            rows = []
+            for model in models:
+                try:
+                    rows.extend(self._insert_with_subscribers([model]))
+                except (psycopg2.DataError, psycopg2.IntegrityError) as row_error:
+                    logger.error(
+                        f"Skipping match stats {model.match_id} for {model.player_name}#{model.player_tag}: {row_error}"
+                    )
+
+        new_matches: Dict[int, List[int]] = {}
+        for match_key, discord_id in rows:
+            new_matches.setdefault(match_key, []).append(discord_id)
+
+        for model in models:
+            discord_ids = new_matches.get(model.match_key)
+            if discord_ids:
+                logger.info(
+                    f"New match recorded for {model.player_name}#{model.player_tag}, "
+                    f"queued {len(discord_ids)} notification(s)"
+                )
+        return new_matches
+
+    def _insert_with_subscribers(self, models: Sequence[BaseModel]) -> List[tuple]:
+        return super().insert_many(
+            models,
+            returning="match_key, account_id",
+            select="""
+                INSERT INTO outbox (match_key, discord_id)
+                SELECT inserted.match_key, subscriptions.discord_id
+                FROM inserted
+                JOIN subscriptions ON subscriptions.account_id = inserted.account_id
+                ON CONFLICT DO NOTHING
+                RETURNING match_key, discord_id
+            """
+        )
 
-        if success:
+
+class OutboxTable(Table):
+    """Match notifications waiting to be delivered, queued by MatchStatsTable.insert_many"""
+
+    def __init__(self, conn, cursor):
+        super().__init__(conn, cursor, "outbox")
+
+    def claim(self, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Claim up to limit due notifications and return them with their match_stats row under 'match'.
+        Claims are leases rather than held locks: available_at moves lease_seconds ahead, so a worker that
+        dies before marking its items only delays them. Concurrent workers skip each other's rows.
+        """
+        self._begin()
+        try:
             self.cursor.execute(
-                "SELECT discord_id FROM players WHERE username = %s AND tag = %s",
-                (model.player_name, model.player_tag)
+                f"""
+                WITH due AS (
+                    SELECT id FROM {self.table_name}
+                    WHERE delivered_at IS NULL AND available_at <= CURRENT_TIMESTAMP
+                    ORDER BY available_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ), claimed AS (
+                    UPDATE {self.table_name} item
+                    SET attempts = item.attempts + 1,
+                        available_at = CURRENT_TIMESTAMP + %s * INTERVAL '1 second'
+                    FROM due
+                    WHERE item.id = due.id
+                    RETURNING item.id, item.discord_id, item.attempts, item.match_key, item.created_at
+                )
+                SELECT claimed.id, claimed.discord_id, claimed.attempts,
+                    EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - claimed.created_at)::FLOAT AS age,
+                    match_stats.*
+                FROM claimed
+                JOIN match_stats ON match_stats.match_key = claimed.match_key
+                ORDER BY claimed.id
+                """,
+                (limit, lease_seconds)
             )
-            results = self.cursor.fetchall()
+            columns = [desc[0] for desc in self.cursor.description]
+            rows = self.cursor.fetchall()
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error claiming from {self.table_name}: {e}")
+            raise
 
-            discord_ids = [row[0] for row in results if row[0]]
-            if discord_ids:
-                logger.info(f"New match recorded for {model.player_name}#{model.player_tag}, notifying {len(discord_ids)} user(s)")
-            return discord_ids
+        claimed = []
+        for row in rows:
+            item = dict(zip(columns[:4], row[:4]))
+            item["match"] = dict(zip(columns[4:], row[4:]))
+            claimed.append(item)
+        return claimed
+
+    def mark_delivered(self, ids: Sequence[int]) -> None:
+        """Mark claimed notifications as delivered"""
+        self._begin()
+        try:
+            self.cursor.execute(
+                f"UPDATE {self.table_name} SET delivered_at = CURRENT_TIMESTAMP, last_error = NULL WHERE id = ANY(%s)",
+                (list(ids),)
+            )
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error updating {self.table_name}: {e}")
+            raise
 
-        return []
+    def reschedule(self, failures: Sequence[tuple]) -> None:
+        """
+        Record failed deliveries from (id, retry_in, error) tuples. Each is retried after retry_in seconds,
+        or never if retry_in is None, it's then kept with its error for inspection.
+        """
+        self._begin()
+        try:
+            execute_values(
+                self.cursor,
+                f"""
+                UPDATE {self.table_name} item
+                SET last_error = failed.error,
+                    available_at = CASE
+                        WHEN failed.retry_in IS NULL THEN 'infinity'::TIMESTAMP
+                        ELSE CURRENT_TIMESTAMP + failed.retry_in * INTERVAL '1 second'
+                    END
+                FROM (VALUES %s) AS failed (id, retry_in, error)
+                WHERE item.id = failed.id
+                """,
+                failures,
+                template="(%s, %s::FLOAT, %s)"
+            )
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error updating {self.table_name}: {e}")
+            raise
+
+    def purge_delivered(self, older_than_seconds: float) -> int:
+        """Delete notifications delivered more than older_than_seconds ago, returns the number deleted"""
+        self._begin()
+        try:
+            self.cursor.execute(
+                f"""
+                DELETE FROM {self.table_name}
+                WHERE delivered_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                """,
+                (older_than_seconds,)
+            )
+            deleted = self.cursor.rowcount
+            self._commit()
+            return deleted
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Error deleting from {self.table_name}: {e}")
+            raise
@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+import os
+from dotenv import load_dotenv
+
+from interfaces.job import Job
+from utils.hash import account_key
+from utils.http import request_many
+from app.models.match import MatchStats
+from app.models.henrik import decode_match_response
+from app.database.tables import MatchStatsTable, PlayersTable
+from app.database.migrations import migrate
+from app.database.connection import AsyncDatabase, get_database
+from app.jobs.tracker_job import HENRIK_MATCHES_URL
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Henrik returns at most this many matches per request, older history is paged with start
+BACKFILL_PAGE_SIZE = 10
+
+# Pages of competitive history loaded per account by default
+BACKFILL_PAGES = 10
+
+
+class BackfillJob(Job):
+    """
+    Load tracked accounts' competitive match history into match_stats with the COPY bulk loader.
+    Backfilled matches are history, nobody is notified about them.
+    """
+
+    def __init__(
+        self,
+        accounts: Optional[List[Tuple[str, str, str]]] = None,
+        pages: int = BACKFILL_PAGES,
+        job_id: str = "backfill_job",
+        db: Optional[AsyncDatabase] = None
+    ):
+        super().__init__(job_id)
+        # (username, tag, region) accounts to backfill, every tracked account if None
+        self.accounts = accounts
+        self.pages = pages
+        self.db = db
+
+    async def setup_resources(self) -> None:
+        """Setup database connection"""
+        self.db = self.db or get_database()
+        if self.db is None:
+            self.db = AsyncDatabase()
+            self.register_cleanup(self.db.close)
+            await self.db.connect()
+            await self.db.run(migrate)
+
+    def build_history_requests(self, accounts: List[tuple]) -> List[tuple]:
+        """Build one request per page of history for each (account_id, username, tag, region, puuid) account"""
+        requests = []
+        headers = {
+            "Authorization": os.getenv("HENRIK_API_KEY"),
+            "User-Agent": "Mozilla/5.0",
+            "Accept": "application/json"
+        }
+
+        for _, username, tag, region, _ in accounts:
+            for page in range(self.pages):
+                url = (
+                    f"{HENRIK_MATCHES_URL}/{region}/pc/{username}/{tag}"
+                    f"?mode=competitive&size={BACKFILL_PAGE_SIZE}&start={page * BACKFILL_PAGE_SIZE}"
+                )
+                requests.append(("GET", url, None, headers))
+
+        return requests
+
+    async def run_implementation(self) -> Dict[str, Any]:
+        roster = await self.db.table(PlayersTable).tracked_accounts()
+        if self.accounts is None:
+            accounts = roster
+        else:
+            wanted = {(account_key(username, tag), region.lower()) for username, tag, region in self.accounts}
+            accounts = [account for account in roster if (account_key(account[1], account[2]), account[3]) in wanted]
+
+        # Every tracked participant of a match gets their row, like in the tracker
+        tracked: Dict[str, tuple] = {}
+        tracked_ids: Dict[str, int] = {}
+        for account_id, username, tag, _, _ in roster:
+            key = account_key(username, tag)
+            tracked[key] = (username, tag)
+            tracked_ids[key] = account_id
+
+        responses = await request_many(self.build_history_requests(accounts), decoder=decode_match_response)
+
+        rows: Dict[int, MatchStats] = {}
+        failed_pages = 0
+        for response in responses:
+            if not isinstance(response, dict) or response.get('status') != 200:
+                failed_pages += 1
+                continue
+
+            for match in (response.get('data') or {}).get('data') or []:
+                if not isinstance(match, dict):
+                    continue
+                for participant_key, stats in MatchStats.from_henrik_match(match, tracked).items():
+                    stats.account_id = tracked_ids[participant_key]
+                    rows.setdefault(stats.match_key, stats)
+
+        # Merged straight into match_stats, not through insert_many, so no notifications are queued
+        loaded = await self.db.table(MatchStatsTable).copy_many(rows.values())
+        logger.info(f"Backfilled {loaded} new match stats for {len(accounts)} account(s)")
+
+        return {
+            "accounts": len(accounts),
+            "pages_requested": len(responses),
+            "pages_failed": failed_pages,
+            "matches_parsed": len(rows),
+            "matches_loaded": loaded
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill competitive match history for tracked accounts")
+    parser.add_argument("accounts", nargs="*", help="<username>#<tag>, every tracked account if none are given")
+    parser.add_argument("--region", default=None, help="region of the given accounts")
+    parser.add_argument("--pages", type=int, default=BACKFILL_PAGES, help=f"pages of {BACKFILL_PAGE_SIZE} matches")
+    args = parser.parse_args()
+
+    if args.accounts and args.region is None:
+        parser.error("--region is required when accounts are given")
+    accounts = [(*account.split('#', 1), args.region) for account in args.accounts] or None
+    job = BackfillJob(accounts, pages=args.pages)
+    result = asyncio.run(job.execute())
+    logger.info(result)
@@ -1,14 +1,22 @@
 import asyncio
-from typing import Dict, Any, List
+import time
+from contextlib import aclosing
+from typing import Dict, Any, List, Optional, Set
 import logging
-import psycopg2
 import os
 from dotenv import load_dotenv
 
 from interfaces.job import Job
-from utils.http import request_many
+from utils.hash import account_key
+from utils.batching import batch_stream
+from utils.http import stream_requests, get_http_client, CircuitBreaker, PermanentClientError
 from app.models.match import MatchStats
-from app.database.tables import MatchStatsTable, create_tables
+from app.models.henrik import decode_match_response
+from app.database.tables import MatchStatsTable, PlayersTable
+from app.database.migrations import migrate
+from app.database.connection import AsyncDatabase, get_database
+from app.services.poll_scheduler import PollScheduler
+from app.services.outbox_worker import OutboxWorker
 
 # Load environment variables
 load_dotenv()
@@ -20,53 +28,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+HENRIK_API_HOST = "api.henrikdev.xyz"
+HENRIK_MATCHES_URL = f"https://{HENRIK_API_HOST}/valorant/v4/matches"
+
+# Maximum number of Henrik API requests in flight at once
+REQUEST_CONCURRENCY = 10
+
+# Parsed stats are written in batches of up to this many rows, a partial batch is flushed
+# after INSERT_BATCH_MAX_DELAY seconds so slow responses don't delay notifications for long
+INSERT_BATCH_SIZE = 200
+INSERT_BATCH_MAX_DELAY = 0.5
+
 
 class TrackerJob(Job):
     """Tracker job class that fetches player stats from Tracker.gg API for each player in the database"""
 
-    def __init__(self, job_id: str = "tracker_job", notifier=None):
+    def __init__(
+        self,
+        job_id: str = "tracker_job",
+        outbox_worker: Optional[OutboxWorker] = None,
+        poll_scheduler: Optional[PollScheduler] = None,
+        db: Optional[AsyncDatabase] = None
+    ):
         super().__init__(job_id)
-        self.conn = None
-        self.cursor = None
-        self.notifier = notifier
+        self.db = db
+        self.outbox_worker = outbox_worker
+        self.poll_scheduler = poll_scheduler
 
     async def setup_resources(self) -> None:
         """Setup database connection"""
-        self.conn = psycopg2.connect(
-            dbname=os.getenv("DB_NAME", "valorant"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST", "localhost"),
-            port=os.getenv("DB_PORT", "5432"),
-        )
-        self.cursor = self.conn.cursor()
-
-        # Create tables if they don't exist
-        create_tables(self.conn, self.cursor)
-
-        # Initialize table abstractions
-        self.match_stats_table = MatchStatsTable(self.conn, self.cursor)
-
-        # Register cleanup to close connection
-        self.register_cleanup(self._close_db_connection)
-
-    def _close_db_connection(self) -> None:
-        """Close database connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
-
-    async def fetch_player_metrics(self, players: List[tuple]) -> List[Dict[str, Any]]:
-        """Fetch player metrics from Henrik's Valorant API for each player"""
+        # psycopg2 calls run on the database's worker threads, off the event loop the Discord bot runs on.
+        # Connections come from the process-wide pool so a tick doesn't pay for a fresh connection.
+        self.db = self.db or get_database()
+        if self.db is None:
+            # Standalone run without the shared pool, so nothing has migrated the schema yet
+            self.db = AsyncDatabase()
+            self.register_cleanup(self.db.close)
+            await self.db.connect()
+            await self.db.run(migrate)
+
+    def build_player_requests(self, players: List[tuple]) -> List[tuple]:
+        """Build Henrik's Valorant API requests for each (account_id, username, tag, region, puuid) account"""
         requests = []
         api_key = os.getenv("HENRIK_API_KEY")
 
         for player in players:
-            username, tag = player
-            region = 'na'
+            _, username, tag, region, _ = player
             # Try v1 endpoint which may not require auth
-            url = f"https://api.henrikdev.xyz/valorant/v4/matches/{region}/pc/{username}/{tag}?mode=competitive&size=1"
+            url = f"{HENRIK_MATCHES_URL}/{region}/pc/{username}/{tag}?mode=competitive&size=1"
             headers = {
                 "Authorization": api_key,
                 "User-Agent": "Mozilla/5.0",
@@ -74,48 +83,198 @@ class TrackerJob(Job):
             }
             requests.append(("GET", url, None, headers))
 
-        results = await request_many(requests)
+        return requests
 
-        return results
+    def _record_poll(self, account_id: int, response: Any, new_match: bool) -> None:
+        """Feed a poll's outcome back into the adaptive schedule"""
+        if not self.poll_scheduler:
+            return
+        if not isinstance(response, dict):
+            self.poll_scheduler.record_failure(account_id)
+        elif response.get('status') == 200 or response.get('error_type') == PermanentClientError.__name__:
+            # A permanent 4xx (e.g. a renamed account) won't change on the next poll, back off like an idle one
+            self.poll_scheduler.record_poll(account_id, new_match=new_match)
+        else:
+            # Timeouts, 5xx and 429 say nothing about the player, don't back them off for it
+            self.poll_scheduler.record_failure(account_id)
 
     async def run_implementation(self) -> Dict[str, Any]:
-        # Retrieve list of players from DB
-        self.cursor.execute("SELECT DISTINCT username, tag FROM players")
-        players = self.cursor.fetchall()
-
-        # Fetch match stats from API
-        results = await self.fetch_player_metrics(players)
-
-        # Parse into MatchStats models
-        match_stats = []
-        for response, (player_name, player_tag) in zip(results, players):
-            match_stat = MatchStats.from_henrik_api(response, player_name, player_tag)
-            if match_stat:
-                match_stats.append(match_stat)
-
-        # Insert matches and collect notifications for new matches
-        new_matches = []
-        for stats in match_stats:
-            discord_user_ids = self.match_stats_table.insert(stats)
-            for discord_user_id in discord_user_ids:
-                new_matches.append({
-                    "discord_user_id": discord_user_id,
-                    "stats": stats
-                })
-
-        # Send Discord notifications for new matches
-        notifications_sent = 0
-        if self.notifier and new_matches:
-            notifications_sent = await self.notifier.send_bulk_notifications(new_matches)
-            logger.info(f"Sent {notifications_sent}/{len(new_matches)} Discord notifications")
-
-        return {
+        # Skip the tick cheaply while Henrik's API is known to be down
+        http_client = get_http_client()
+        if http_client and http_client.circuit_state(HENRIK_MATCHES_URL) == CircuitBreaker.OPEN:
+            breaker = http_client.circuit_breaker(HENRIK_MATCHES_URL).snapshot()
+            logger.warning(f"Henrik API circuit is open, skipping tick (retry in {breaker['retry_in']}s)")
+            return {"skipped": "circuit_open", "circuit_breaker": breaker}
+
+        # The roster is read on a connection of its own before the unit of work, whose transaction only
+        # opens with a batch's first write, so no transaction sits idle while the tick waits on Henrik
+        accounts = await self.db.table(PlayersTable).tracked_accounts()
+
+        # The tick's writes share one pooled connection and are committed once per insert batch, each write
+        # in its own savepoint. New matches queue their notifications in the outbox in the same statements,
+        # so they become deliverable as soon as their batch is committed, not when the slowest player is done.
+        async with self.db.unit_of_work() as work:
+            self.unit_of_work = work
+            self.players_table = work.table(PlayersTable)
+            self.match_stats_table = work.table(MatchStatsTable)
+            result = await self.track_players(http_client, accounts)
+
+        result["database"] = work.stats()
+        return result
+
+    async def track_players(self, http_client, accounts: List[tuple]) -> Dict[str, Any]:
+        """
+        Poll the players that are due out of the tracked accounts, store their new matches and notify subscribers.
+        """
+        # Everything below keys on the account ids
+        roster = {account[0]: account for account in accounts}
+
+        # Only poll players that are due, idle accounts are polled less and less often
+        if self.poll_scheduler:
+            self.poll_scheduler.sync(roster)
+            players = [roster[account_id] for account_id in self.poll_scheduler.pop_due()]
+        else:
+            players = list(roster.values())
+
+        # Tracked players are matched case-insensitively against each match's participants
+        tracked: Dict[str, tuple] = {}
+        tracked_ids: Dict[str, int] = {}
+        for account_id, username, tag, _, _ in roster.values():
+            key = account_key(username, tag)
+            tracked[key] = (username, tag)
+            tracked_ids[key] = account_id
+        # Accounts whose puuid is stored the first time they turn up in a match
+        unresolved = {account_id for account_id, *_, puuid in roster.values() if puuid is None}
+
+        started_at = time.monotonic()
+        first_notification_at = None
+        matches_parsed = 0
+        new_matches = 0
+        downloads_saved = 0
+        parses_saved = 0
+
+        # API match ids already extracted this tick, and players whose new match has already been stored from
+        # a teammate's payload. Their own request is dropped if it hasn't started yet, and a detected match
+        # tightens their poll interval so anything newer is picked up on the next tick.
+        seen_matches: Set[str] = set()
+        covered: Set[str] = set()
+
+        def is_covered(index: int) -> bool:
+            nonlocal downloads_saved
+            _, username, tag, _, _ = players[index]
+            if account_key(username, tag) in covered:
+                downloads_saved += 1
+                return True
+            return False
+
+        # Parse responses as they arrive and write them in small batches, so one slow player doesn't hold up
+        # everyone else and a tick's stats go out in a few multi-row inserts instead of one round trip each
+        requests = self.build_player_requests(players)
+        try:
+            # Closed explicitly so in-flight requests are cancelled as soon as the loop exits, even on an error
+            async with (
+                aclosing(stream_requests(
+                    requests,
+                    concurrency=REQUEST_CONCURRENCY,
+                    decoder=decode_match_response,
+                    skip=is_covered
+                )) as responses,
+                aclosing(batch_stream(responses, INSERT_BATCH_SIZE, INSERT_BATCH_MAX_DELAY)) as batches
+            ):
+                async for batch in batches:
+                    polled = [(players[index], response) for index, response in batch]
+                    polled_keys = {account_key(player[1], player[2]) for player, _ in polled}
+                    pending: List[tuple] = []
+                    resolved: List[tuple] = []
+
+                    for player, response in polled:
+                        _, player_name, player_tag, _, _ = player
+                        key = account_key(player_name, player_tag)
+
+                        latest_match = MatchStats.latest_match(response, player_name, player_tag)
+                        if latest_match is None:
+                            continue
+
+                        # Every tracked participant was extracted the first time this match came in
+                        api_match_id = (latest_match.get('metadata') or {}).get('match_id', '')
+                        if api_match_id and api_match_id in seen_matches:
+                            parses_saved += 1
+                            continue
+                        seen_matches.add(api_match_id)
+
+                        match_stats = MatchStats.from_henrik_match(latest_match, tracked)
+                        if key not in match_stats:
+                            logger.warning(f"Could not find stats for {player_name}#{player_tag} in match data")
+
+                        matches_parsed += len(match_stats)
+                        for participant_key, stats in match_stats.items():
+                            stats.account_id = tracked_ids[participant_key]
+                            pending.append((participant_key, stats))
+                            if stats.puuid and stats.account_id in unresolved:
+                                unresolved.discard(stats.account_id)
+                                resolved.append((stats.account_id, stats.puuid))
+
+                    # Insert every tracked participant's stats at once, queueing notifications for the new ones
+                    if not pending:
+                        new_match_subscribers = {}
+                    else:
+                        if resolved:
+                            await self.players_table.resolve_puuids(resolved)
+                        new_match_subscribers = await self.match_stats_table.insert_many(
+                            [stats for _, stats in pending]
+                        )
+                        await self.unit_of_work.commit()
+
+                    # The batch's notifications are committed, hand them to the outbox worker straight away
+                    if new_match_subscribers:
+                        if self.outbox_worker:
+                            self.outbox_worker.wake()
+                        if first_notification_at is None:
+                            first_notification_at = time.monotonic()
+
+                    for participant_key, stats in pending:
+                        discord_user_ids = new_match_subscribers.get(stats.match_key)
+                        if not discord_user_ids:
+                            continue
+
+                        covered.add(participant_key)
+                        new_matches += len(discord_user_ids)
+                        if participant_key not in polled_keys and self.poll_scheduler:
+                            self.poll_scheduler.record_poll(tracked_ids[participant_key], new_match=True)
+
+                    for player, response in polled:
+                        account_id, player_name, player_tag, _, _ = player
+                        new_match = account_key(player_name, player_tag) in covered
+                        self._record_poll(account_id, response, new_match=new_match)
+        finally:
+            if self.poll_scheduler:
+                self.poll_scheduler.requeue_unfinished()
+
+        if new_matches:
+            logger.info(f"Queued {new_matches} Discord notifications")
+
+        result = {
+            "players_tracked": len(roster),
             "players_processed": len(players),
-            "matches_parsed": len(match_stats),
-            "new_matches": len(new_matches),
-            "notifications_sent": notifications_sent
+            "matches_parsed": matches_parsed,
+            "new_matches": new_matches,
+            "notifications_queued": new_matches,
+            "first_notification_seconds": (
+                round(first_notification_at - started_at, 3) if first_notification_at is not None else None
+            ),
+            "payload_downloads_saved": downloads_saved,
+            "payload_parses_saved": parses_saved
         }
 
+        if self.poll_scheduler:
+            result["poll_schedule"] = self.poll_scheduler.stats()
+
+        # Remaining API budget, useful for deciding how much the next tick can poll
+        if http_client:
+            result["rate_limit_budget"] = http_client.rate_limit_budget(HENRIK_API_HOST)
+
+        return result
+
 
 if __name__ == "__main__":
     job = TrackerJob()
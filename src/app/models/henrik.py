@@ -0,0 +1,137 @@
+"""Projections of Henrik API v4 match payloads down to the fields MatchStats needs"""
+from typing import Any, Dict, List, Optional
+import logging
+
+from utils.decoding import get_json_decoder
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+
+def project_match(match: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only metadata.map, metadata.match_id, players[*] (puuid, name, tag, team_id, agent, stats)
+    and teams[*] (team_id, rounds, won) from a decoded match. Rounds and kill events are dropped.
+    """
+    metadata = match.get('metadata') or {}
+    map_info = metadata.get('map')
+    players = match.get('players') or []
+    if isinstance(players, dict):
+        players = players.get('all_players') or []
+
+    return {
+        'metadata': {
+            'match_id': metadata.get('match_id', ''),
+            'map': {'name': map_info.get('name', 'Unknown')} if isinstance(map_info, dict) else map_info
+        },
+        'players': [
+            {
+                'puuid': player.get('puuid'),
+                'name': player.get('name', ''),
+                'tag': player.get('tag', ''),
+                'team_id': player.get('team_id', ''),
+                'agent': {'name': (player.get('agent') or {}).get('name', 'Unknown')},
+                'stats': player.get('stats', {})
+            }
+            for player in players if isinstance(player, dict)
+        ],
+        'teams': [
+            {
+                'team_id': team.get('team_id'),
+                'rounds': team.get('rounds', {}),
+                'won': team.get('won', False)
+            }
+            for team in (match.get('teams') or []) if isinstance(team, dict)
+        ]
+    }
+
+
+def project_match_response(response: Any) -> Any:
+    """Project every match in a decoded matches response, leaving anything unexpected untouched"""
+    if not isinstance(response, dict) or not isinstance(response.get('data'), list):
+        return response
+
+    return {
+        **{key: value for key, value in response.items() if key != 'data'},
+        'data': [project_match(match) if isinstance(match, dict) else match for match in response['data']]
+    }
+
+
+if msgspec is not None:
+    # Schema-typed decode: msgspec skips every field that isn't declared here without building
+    # Python objects for it, so rounds and kill events never get materialized at all
+    class _Damage(msgspec.Struct):
+        dealt: int = 0
+        received: int = 0
+
+    class _PlayerStats(msgspec.Struct):
+        score: int = 0
+        kills: int = 0
+        deaths: int = 0
+        assists: int = 0
+        headshots: int = 0
+        bodyshots: int = 0
+        legshots: int = 0
+        damage: _Damage = msgspec.field(default_factory=_Damage)
+
+    class _Agent(msgspec.Struct):
+        name: str = 'Unknown'
+
+    class _Player(msgspec.Struct):
+        puuid: Optional[str] = None
+        name: str = ''
+        tag: str = ''
+        team_id: str = ''
+        agent: _Agent = msgspec.field(default_factory=_Agent)
+        stats: _PlayerStats = msgspec.field(default_factory=_PlayerStats)
+
+    class _Rounds(msgspec.Struct):
+        won: int = 0
+        lost: int = 0
+
+    class _Team(msgspec.Struct):
+        team_id: Optional[str] = None
+        rounds: _Rounds = msgspec.field(default_factory=_Rounds)
+        won: bool = False
+
+    class _Map(msgspec.Struct):
+        name: str = 'Unknown'
+
+    class _Metadata(msgspec.Struct):
+        match_id: str = ''
+        map: _Map = msgspec.field(default_factory=_Map)
+
+    class _Match(msgspec.Struct):
+        metadata: _Metadata = msgspec.field(default_factory=_Metadata)
+        players: List[_Player] = []
+        teams: List[_Team] = []
+
+    class _MatchesResponse(msgspec.Struct):
+        status: Optional[int] = None
+        data: List[_Match] = []
+        # Henrik's reason for a failed request, kept for logging
+        errors: Optional[list] = None
+
+    _typed_decoder = msgspec.json.Decoder(_MatchesResponse)
+else:
+    _typed_decoder = None
+
+
+def decode_match_response(body: bytes) -> Any:
+    """
+    Decoder for the v4 matches endpoint that only materializes the fields MatchStats uses.
+    Uses a msgspec schema when installed, otherwise decodes in full and projects straight away
+    so the rest of the payload is freed before the response is handed on.
+    """
+    if _typed_decoder is not None:
+        try:
+            return msgspec.to_builtins(_typed_decoder.decode(body))
+        except msgspec.ValidationError as e:
+            # Payload doesn't match the schema (e.g. nulls or an older shape), take the slow path
+            logger.debug(f"Typed match decode failed, projecting full payload instead: {e}")
+
+    return project_match_response(get_json_decoder()(body))
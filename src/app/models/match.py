@@ -1,8 +1,8 @@
 """Pydantic models for Valorant match data"""
 from pydantic import BaseModel, Field, computed_field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import logging
-from utils.hash import generate_match_hash
+from utils.hash import generate_match_hash, generate_match_key, account_key
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +10,7 @@ logger = logging.getLogger(__name__)
 class MatchStats(BaseModel):
     """Match statistics for a player"""
     match_id: str = Field(description="Unique hash identifier for the match")
+    match_key: int = Field(description="Unique 64-bit key for the match, replacing match_id")
     player_name: str
     player_tag: str
     agent: str
@@ -24,6 +25,8 @@ class MatchStats(BaseModel):
     team_placement: int = Field(description="Placement on team (1-5)", ge=1, le=5)
     map_name: Optional[str] = None
     match_result: Optional[str] = None
+    account_id: Optional[int] = Field(default=None, description="tracked_accounts id of the player, set before storing")
+    puuid: Optional[str] = Field(default=None, exclude=True, description="Riot account id, not stored with the match")
 
     @computed_field
     @property
@@ -36,10 +39,33 @@ class MatchStats(BaseModel):
         """
         Parse API response into MatchStats.
         """
+        latest_match = cls.latest_match(response, player_name, player_tag)
+        if latest_match is None:
+            return None
+
+        key = account_key(player_name, player_tag)
+        match_stats = cls.from_henrik_match(latest_match, {key: (player_name, player_tag)})
+
+        if key not in match_stats:
+            logger.warning(f"Could not find stats for {player_name}#{player_tag} in match data")
+            return None
+
+        return match_stats[key]
+
+    @staticmethod
+    def latest_match(response: Dict[str, Any], player_name: str, player_tag: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recent match from a Henrik API matches response.
+        """
         try:
             # Check if request was successful
             if response.get('status') != 200:
-                logger.warning(f"API request failed for {player_name}#{player_tag}: status {response.get('status')}")
+                body = response.get('data')
+                errors = body.get('errors') if isinstance(body, dict) else None
+                logger.warning(
+                    f"API request failed for {player_name}#{player_tag}: status {response.get('status')}"
+                    + (f", errors {errors}" if errors else "")
+                )
                 return None
 
             # Henrik API v4 structure: response['data'] is a dict with 'data' key containing list of matches
@@ -62,9 +88,25 @@ class MatchStats(BaseModel):
                 logger.error(f"Expected dict for latest_match, got {type(latest_match)}")
                 return None
 
-            # Find the player's stats in the match
-            player_stats = None
-            players_data = latest_match.get('players', [])
+            return latest_match
+
+        except Exception as e:
+            logger.error(f"Error parsing Henrik API response for {player_name}#{player_tag}: {e}")
+            return None
+
+    @classmethod
+    def from_henrik_match(
+        cls,
+        match: Dict[str, Any],
+        tracked: Dict[str, Tuple[str, str]]
+    ) -> Dict[str, 'MatchStats']:
+        """
+        Extract stats for every tracked player in a match in a single pass.
+        `tracked` maps account_key(name, tag) to the (name, tag) spelling stored for that player,
+        the result is keyed the same way.
+        """
+        try:
+            players_data = match.get('players', [])
 
             # Henrik API returns players as a list directly, not nested in 'all_players'
             if isinstance(players_data, dict):
@@ -73,87 +115,110 @@ class MatchStats(BaseModel):
                 all_players = players_data
             else:
                 logger.error(f"Unexpected type for players_data: {type(players_data)}")
-                return None
-
-            for player in all_players:
-                if (
-                    player.get('name', '').lower() == player_name.lower() and
-                    player.get('tag', '').lower() == player_tag.lower()
-                ):
-                    player_stats = player
-                    break
-
-            if not player_stats:
-                logger.warning(f"Could not find stats for {player_name}#{player_tag} in match data")
-                return None
+                return {}
 
-            # Extract stats
-            stats = player_stats.get('stats', {})
-            metadata = latest_match.get('metadata', {})
-            teams = latest_match.get('teams', [])
-
-            # Calculate team placement based on score
-            team_id = player_stats.get('team_id', '')
-            team_players = [p for p in all_players if p.get('team_id') == team_id]
-            sorted_team = sorted(
-                team_players,
-                key=lambda p: p.get('stats', {}).get('score', 0) if isinstance(p.get('stats'), dict) else 0,
-                reverse=True)
-            team_placement = next((
-                i + 1 for i,
-                p in enumerate(sorted_team) if p.get('name', '').lower() == player_name.lower() and
-                p.get('tag', '').lower() == player_tag.lower()), 5)
-
-            # Get team's rounds won/lost
-            player_team = next((t for t in teams if t.get('team_id') == team_id), {})
-            rounds_info = player_team.get('rounds', {})
-            rounds_won = rounds_info.get('won', 0)
-            rounds_lost = rounds_info.get('lost', 0)
-            total_rounds = rounds_won + rounds_lost
-
-            # Extract damage stats
-            damage_stats = stats.get('damage', {})
-            damage_dealt = damage_stats.get('dealt', 0) if isinstance(damage_stats, dict) else 0
-            damage_received = damage_stats.get('received', 0) if isinstance(damage_stats, dict) else 0
-
-            # Calculate headshot percentage
-            headshots = stats.get('headshots', 0)
-            bodyshots = stats.get('bodyshots', 0)
-            legshots = stats.get('legshots', 0)
-            total_shots = headshots + bodyshots + legshots
-            headshot_pct = (headshots / total_shots * 100) if total_shots > 0 else 0
+            metadata = match.get('metadata', {})
+            teams = match.get('teams', [])
 
             # Get map name
             map_info = metadata.get('map', {})
             map_name = map_info.get('name', 'Unknown') if isinstance(map_info, dict) else 'Unknown'
-
-            # Generate unique match_id hash from match_id + player
-            # This creates a unique identifier for each player's performance in a specific match
             api_match_id = metadata.get('match_id', '')
-            match_id = generate_match_hash(api_match_id, player_name, player_tag)
-
-            # Build MatchStats object
-            return cls(
-                match_id=match_id,
-                player_name=player_name,
-                player_tag=player_tag,
-                agent=player_stats.get('agent', {}).get('name', 'Unknown'),
-                game_score=f"{rounds_won}-{rounds_lost}",
-                kills=int(stats.get('kills', 0)),
-                deaths=int(stats.get('deaths', 1)),
-                assists=int(stats.get('assists', 0)),
-                damage_delta=int(damage_dealt - damage_received),
-                headshot_percentage=round(headshot_pct, 1),
-                adr=round(damage_dealt / max(total_rounds, 1), 1),
-                acs=round(stats.get('score', 0) / max(total_rounds, 1), 1),
-                team_placement=team_placement,
-                map_name=map_name,
-                match_result="Victory" if player_team.get('won', False) else "Defeat"
-            )
+
+            # Calculate team placements based on score, sorting each team once for all tracked players
+            team_players: Dict[Any, List[Dict[str, Any]]] = {}
+            for player in all_players:
+                team_players.setdefault(player.get('team_id', ''), []).append(player)
+            team_placements = {}
+            for players in team_players.values():
+                sorted_team = sorted(
+                    players,
+                    key=lambda p: p.get('stats', {}).get('score', 0) if isinstance(p.get('stats'), dict) else 0,
+                    reverse=True)
+                for i, p in enumerate(sorted_team):
+                    team_placements.setdefault(account_key(p.get('name', ''), p.get('tag', '')), i + 1)
+
+            match_stats = {}
+            for player_stats in all_players:
+                key = account_key(player_stats.get('name', ''), player_stats.get('tag', ''))
+                if key not in tracked or key in match_stats:
+                    continue
+
+                player_name, player_tag = tracked[key]
+                try:
+                    match_stats[key] = cls._from_henrik_player(
+                        player_stats, player_name, player_tag, api_match_id, map_name, teams,
+                        team_placements.get(key, 5)
+                    )
+                except Exception as e:
+                    logger.error(f"Error parsing Henrik API response for {player_name}#{player_tag}: {e}")
+
+            return match_stats
 
         except Exception as e:
-            logger.error(f"Error parsing Henrik API response for {player_name}#{player_tag}: {e}")
-            return None
+            logger.error(f"Error parsing Henrik match data: {e}")
+            return {}
+
+    @classmethod
+    def _from_henrik_player(
+        cls,
+        player_stats: Dict[str, Any],
+        player_name: str,
+        player_tag: str,
+        api_match_id: str,
+        map_name: str,
+        teams: List[Dict[str, Any]],
+        team_placement: int
+    ) -> 'MatchStats':
+        """Build MatchStats from one entry of a match's players list"""
+        # Extract stats
+        stats = player_stats.get('stats', {})
+
+        # Get team's rounds won/lost
+        team_id = player_stats.get('team_id', '')
+        player_team = next((t for t in teams if t.get('team_id') == team_id), {})
+        rounds_info = player_team.get('rounds', {})
+        rounds_won = rounds_info.get('won', 0)
+        rounds_lost = rounds_info.get('lost', 0)
+        total_rounds = rounds_won + rounds_lost
+
+        # Extract damage stats
+        damage_stats = stats.get('damage', {})
+        damage_dealt = damage_stats.get('dealt', 0) if isinstance(damage_stats, dict) else 0
+        damage_received = damage_stats.get('received', 0) if isinstance(damage_stats, dict) else 0
+
+        # Calculate headshot percentage
+        headshots = stats.get('headshots', 0)
+        bodyshots = stats.get('bodyshots', 0)
+        legshots = stats.get('legshots', 0)
+        total_shots = headshots + bodyshots + legshots
+        headshot_pct = (headshots / total_shots * 100) if total_shots > 0 else 0
+
+        # Generate unique match_id hash from match_id + player
+        # This creates a unique identifier for each player's performance in a specific match
+        match_id = generate_match_hash(api_match_id, player_name, player_tag)
+        match_key = generate_match_key(api_match_id, player_name, player_tag)
+
+        # Build MatchStats object
+        return cls(
+            match_id=match_id,
+            match_key=match_key,
+            player_name=player_name,
+            player_tag=player_tag,
+            agent=player_stats.get('agent', {}).get('name', 'Unknown'),
+            game_score=f"{rounds_won}-{rounds_lost}",
+            kills=int(stats.get('kills', 0)),
+            deaths=int(stats.get('deaths', 1)),
+            assists=int(stats.get('assists', 0)),
+            damage_delta=int(damage_dealt - damage_received),
+            headshot_percentage=round(headshot_pct, 1),
+            adr=round(damage_dealt / max(total_rounds, 1), 1),
+            acs=round(stats.get('score', 0) / max(total_rounds, 1), 1),
+            team_placement=team_placement,
+            map_name=map_name,
+            match_result="Victory" if player_team.get('won', False) else "Defeat",
+            puuid=player_stats.get('puuid')
+        )
 
     class Config:
         json_schema_extra = {
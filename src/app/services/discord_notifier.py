@@ -1,16 +1,111 @@
 """Discord notification service for sending match updates"""
+import asyncio
+import time
+import weakref
 import discord
 import logging
+from typing import Any, Dict, List, Optional, Tuple
 from app.models.match import MatchStats
+from utils.cache import LRUCache
+from utils.http import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Resolved users and their DM channels, so repeat recipients don't cost a REST call each time
+USER_CACHE_SIZE = 5000
+USER_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Maximum number of notifications in flight at once
+NOTIFY_CONCURRENCY = 10
+
+# Discord's global limit is 50 requests per second per bot, across every route
+DISCORD_GLOBAL_RATE_LIMIT = 50
+
+# Discord allows up to 10 embeds per message, ten match embeds stay well under its 6000 character total
+MAX_EMBEDS_PER_MESSAGE = 10
+
 
 class DiscordNotifier:
     """Service for sending Discord notifications"""
 
-    def __init__(self, bot: discord.Client):
+    def __init__(
+        self,
+        bot: discord.Client,
+        cache_size: int = USER_CACHE_SIZE,
+        cache_ttl: float = USER_CACHE_TTL_SECONDS,
+        concurrency: int = NOTIFY_CONCURRENCY,
+        global_rate_limit: int = DISCORD_GLOBAL_RATE_LIMIT
+    ):
         self.bot = bot
+        self.concurrency = concurrency
+        self._users = LRUCache(cache_size, cache_ttl)
+        self._channels = LRUCache(cache_size, cache_ttl)
+        self._gateway_hits = 0
+        self._rest_calls = 0
+        self._rest_calls_avoided = 0
+        self._messages = 0
+        self._embeds_rendered = 0
+        # Every REST call takes a token from the global bucket. Sends to one recipient share a DM channel,
+        # i.e. one per-route bucket, so they're serialized and only different recipients run in parallel.
+        self._global_limit = RateLimiter(capacity=global_rate_limit, window=1.0)
+        self._recipient_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def _dm_channel(self, discord_user_id: int) -> discord.abc.Messageable:
+        """
+        Resolve a user's DM channel, from the cache, then the bot's gateway state, and only then over REST.
+        """
+        channel = self._channels.get(discord_user_id)
+        if channel is not None:
+            # Skips the user lookup and with it a fetch_user. create_dm isn't counted, discord.py
+            # keeps open DM channels on the user, so an uncached lookup wouldn't need it again either.
+            self._rest_calls_avoided += 1
+            return channel
+
+        user = self._users.get(discord_user_id)
+        if user is None:
+            user = self.bot.get_user(discord_user_id)
+            if user is not None:
+                self._gateway_hits += 1
+                self._rest_calls_avoided += 1
+            else:
+                self._rest_calls += 1
+                await self._global_limit.acquire()
+                user = await self.bot.fetch_user(discord_user_id)
+            self._users.set(discord_user_id, user)
+        else:
+            self._rest_calls_avoided += 1
+
+        channel = user.dm_channel
+        if channel is None:
+            self._rest_calls += 1
+            await self._global_limit.acquire()
+            channel = await user.create_dm()
+        self._channels.set(discord_user_id, channel)
+        return channel
+
+    def stats(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Return user and DM-channel cache counters since the last reset.
+        rest_calls_avoided counts the fetch_user calls skipped thanks to the caches or the gateway state.
+        """
+        users = self._users.stats(reset)
+        channels = self._channels.stats(reset)
+        stats = {
+            "users": users,
+            "dm_channels": channels,
+            "gateway_hits": self._gateway_hits,
+            "rest_calls": self._rest_calls,
+            "rest_calls_avoided": self._rest_calls_avoided,
+            "messages_sent": self._messages,
+            "embeds_rendered": self._embeds_rendered
+        }
+        if reset:
+            self._gateway_hits = 0
+            self._rest_calls = 0
+            self._rest_calls_avoided = 0
+            self._messages = 0
+            self._embeds_rendered = 0
+        return stats
 
     async def send_match_notification(self, discord_user_id: int, stats: MatchStats) -> bool:
         """
@@ -23,68 +118,134 @@ class DiscordNotifier:
         Returns:
             True if notification was sent successfully, False otherwise
         """
+        return await self._send(discord_user_id, [self._build_embed(stats)]) is None
+
+    def _build_embed(self, stats: MatchStats) -> discord.Embed:
+        """Build the notification embed for one match"""
+        # Create embed for match notification
+        embed = discord.Embed(
+            title="🎮 New Match Detected!",
+            description=f"**{stats.player_name}#{stats.player_tag}** just finished a match!",
+            color=discord.Color.green() if stats.match_result == "Victory" else discord.Color.red()
+        )
+
+        # Add match details
+        embed.add_field(name="Agent", value=stats.agent, inline=True)
+        embed.add_field(name="Map", value=stats.map_name or "Unknown", inline=True)
+        embed.add_field(name="Result", value=stats.match_result or "Unknown", inline=True)
+
+        embed.add_field(name="Score", value=stats.game_score, inline=True)
+        embed.add_field(name="K/D/A", value=f"{stats.kills}/{stats.deaths}/{stats.assists}", inline=True)
+        embed.add_field(name="K/D Ratio", value=f"{stats.kd_ratio}", inline=True)
+
+        embed.add_field(name="ACS", value=f"{stats.acs}", inline=True)
+        embed.add_field(name="ADR", value=f"{stats.adr}", inline=True)
+        embed.add_field(name="HS%", value=f"{stats.headshot_percentage}%", inline=True)
+
+        embed.add_field(name="Damage Δ", value=f"{stats.damage_delta:+d}", inline=True)
+        embed.add_field(name="Team Rank", value=f"#{stats.team_placement}/5", inline=True)
+        embed.add_field(name="\u200b", value="\u200b", inline=True)  # Empty field for alignment
+
+        embed.set_footer(text=f"Match ID: {stats.match_id}")
+        return embed
+
+    async def _send(self, discord_user_id: int, embeds: List[discord.Embed]) -> Optional[str]:
+        """Send match embeds in one DM and return None, or why it failed ('not_found', 'forbidden' or 'error')"""
         try:
-            user = await self.bot.fetch_user(discord_user_id)
-            if not user:
-                logger.warning(f"Could not find Discord user with ID {discord_user_id}")
-                return False
-
-            # Create embed for match notification
-            embed = discord.Embed(
-                title="🎮 New Match Detected!",
-                description=f"**{stats.player_name}#{stats.player_tag}** just finished a match!",
-                color=discord.Color.green() if stats.match_result == "Victory" else discord.Color.red()
-            )
-
-            # Add match details
-            embed.add_field(name="Agent", value=stats.agent, inline=True)
-            embed.add_field(name="Map", value=stats.map_name or "Unknown", inline=True)
-            embed.add_field(name="Result", value=stats.match_result or "Unknown", inline=True)
-
-            embed.add_field(name="Score", value=stats.game_score, inline=True)
-            embed.add_field(name="K/D/A", value=f"{stats.kills}/{stats.deaths}/{stats.assists}", inline=True)
-            embed.add_field(name="K/D Ratio", value=f"{stats.kd_ratio}", inline=True)
-
-            embed.add_field(name="ACS", value=f"{stats.acs}", inline=True)
-            embed.add_field(name="ADR", value=f"{stats.adr}", inline=True)
-            embed.add_field(name="HS%", value=f"{stats.headshot_percentage}%", inline=True)
-
-            embed.add_field(name="Damage Δ", value=f"{stats.damage_delta:+d}", inline=True)
-            embed.add_field(name="Team Rank", value=f"#{stats.team_placement}/5", inline=True)
-            embed.add_field(name="\u200b", value="\u200b", inline=True)  # Empty field for alignment
-
-            embed.set_footer(text=f"Match ID: {stats.match_id}")
+            channel = await self._dm_channel(discord_user_id)
 
             # Send DM to user
-            await user.send(embed=embed)
-            logger.info(f"Sent match notification to Discord user {discord_user_id}")
-            return True
-
+            await self._global_limit.acquire()
+            await channel.send(embeds=embeds)
+            self._messages += 1
+            logger.info(f"Sent {len(embeds)} match notification(s) to Discord user {discord_user_id}")
+            return None
+
+        except discord.NotFound:
+            logger.warning(f"Could not find Discord user with ID {discord_user_id}")
+            self._forget(discord_user_id)
+            return "not_found"
         except discord.Forbidden:
             logger.warning(f"Cannot send DM to user {discord_user_id} - DMs may be disabled")
-            return False
+            return "forbidden"
         except Exception as e:
             logger.error(f"Error sending notification to user {discord_user_id}: {e}")
-            return False
-
-    async def send_bulk_notifications(self, notifications: list) -> int:
+            self._forget(discord_user_id)
+            return "error"
+
+    def _forget(self, discord_user_id: int) -> None:
+        """Drop a user's cached entries so the next notification resolves them again"""
+        self._users.invalidate(discord_user_id)
+        self._channels.invalidate(discord_user_id)
+
+    def _recipient_lock(self, discord_user_id: int) -> asyncio.Lock:
+        lock = self._recipient_locks.get(discord_user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._recipient_locks[discord_user_id] = lock
+        return lock
+
+    async def _dispatch(
+        self,
+        semaphore: asyncio.Semaphore,
+        discord_user_id: int,
+        digest: List[Tuple[Dict[str, Any], discord.Embed]],
+        queued_at: float
+    ) -> None:
+        """Send one recipient's digest as a single message and fill in its outcomes"""
+        embeds = [embed for _, embed in digest]
+
+        # Take the recipient's lock first so a send queued behind it doesn't hold a concurrency slot
+        async with self._recipient_lock(discord_user_id):
+            async with semaphore:
+                error = await self._send(discord_user_id, embeds)
+
+        latency = round(time.monotonic() - queued_at, 3)
+        for outcome, _ in digest:
+            outcome["error"] = error
+            outcome["sent"] = error is None
+            outcome["latency"] = latency
+
+    async def send_bulk_notifications(self, notifications: list) -> List[Dict[str, Any]]:
         """
-        Send multiple match notifications.
+        Send multiple match notifications concurrently. A recipient's notifications are packed into
+        digests of up to MAX_EMBEDS_PER_MESSAGE embeds, one DM each. Each match's embed is rendered
+        once and shared by every recipient, its content doesn't depend on who receives it.
 
         Args:
             notifications: List of dicts with 'discord_user_id' and 'stats' keys
 
         Returns:
-            Number of notifications sent successfully
+            One outcome per notification, in order, with 'discord_user_id', 'match_id', 'sent',
+            'error' (None, 'not_found', 'forbidden', 'error' or 'invalid') and 'latency'
+            (seconds from dispatch until the send finished)
         """
-        sent_count = 0
+        outcomes = []
+        rendered: Dict[int, discord.Embed] = {}
+        recipients: Dict[int, List[Tuple[Dict[str, Any], discord.Embed]]] = {}
         for notification in notifications:
             discord_user_id = notification.get('discord_user_id')
             stats = notification.get('stats')
-
+            outcome = {
+                "discord_user_id": discord_user_id,
+                "match_id": stats.match_id if stats else None,
+                "sent": False,
+                "error": "invalid",
+                "latency": 0.0
+            }
+            outcomes.append(outcome)
             if discord_user_id and stats:
-                success = await self.send_match_notification(discord_user_id, stats)
-                if success:
-                    sent_count += 1
-
-        return sent_count
+                embed = rendered.get(stats.match_key)
+                if embed is None:
+                    embed = rendered[stats.match_key] = self._build_embed(stats)
+                    self._embeds_rendered += 1
+                recipients.setdefault(discord_user_id, []).append((outcome, embed))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        queued_at = time.monotonic()
+        await asyncio.gather(*(
+            self._dispatch(semaphore, discord_user_id, pending[start:start + MAX_EMBEDS_PER_MESSAGE], queued_at)
+            for discord_user_id, pending in recipients.items()
+            for start in range(0, len(pending), MAX_EMBEDS_PER_MESSAGE)
+        ))
+        return outcomes
@@ -0,0 +1,195 @@
+"""Delivery worker for the notification outbox"""
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+import logging
+from pydantic import ValidationError
+
+from app.database.tables import OutboxTable
+from app.models.match import MatchStats
+
+logger = logging.getLogger(__name__)
+
+# Notifications claimed and sent per round
+OUTBOX_BATCH_SIZE = 100
+
+# How long a claimed notification is reserved before another round may claim it again
+OUTBOX_LEASE_SECONDS = 120
+
+# The worker is woken after each tracker commit, polling only picks up retries and missed wakes
+OUTBOX_POLL_SECONDS = 15
+
+# After a wake the worker waits this long before claiming, so notifications committed close together
+# are claimed in one round and a recipient's matches go out as one digest message
+OUTBOX_COALESCE_SECONDS = 2.0
+
+# Retry schedule for failed deliveries, exponential with jitter up to OUTBOX_RETRY_MAX_SECONDS
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 5.0
+OUTBOX_RETRY_MAX_SECONDS = 15 * 60
+
+# Delivered notifications are kept this long, then purged
+OUTBOX_RETENTION_SECONDS = 7 * 24 * 60 * 60
+OUTBOX_PURGE_INTERVAL_SECONDS = 60 * 60
+
+# Failures that retrying won't fix
+PERMANENT_ERRORS = {"not_found", "forbidden", "invalid"}
+
+
+class OutboxWorker:
+    """
+    Background task that claims queued notifications from the outbox, sends them through the
+    DiscordNotifier and marks them delivered, so tracking never waits on Discord.
+    Delivery is at-least-once: a crash between sending and marking resends once the lease expires.
+    """
+
+    def __init__(
+        self,
+        db,
+        notifier,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS,
+        poll_interval: float = OUTBOX_POLL_SECONDS,
+        coalesce_window: float = OUTBOX_COALESCE_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        retry_base_delay: float = OUTBOX_RETRY_BASE_SECONDS,
+        retry_max_delay: float = OUTBOX_RETRY_MAX_SECONDS
+    ):
+        self.db = db
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.coalesce_window = coalesce_window
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._purged_at = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._delivered = 0
+        self._retried = 0
+        self._abandoned = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def start(self) -> None:
+        """Start delivering on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._deliver_forever())
+
+    async def stop(self) -> None:
+        """Stop delivering, anything still queued stays in the outbox"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self) -> None:
+        """Deliver now instead of at the next poll, e.g. right after notifications were committed"""
+        self._wake.set()
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait before retrying a notification that has failed `attempts` times"""
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def stats(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Return delivery counters since the last reset, latency is from queueing to delivery in seconds.
+        """
+        stats = {
+            "delivered": self._delivered,
+            "retried": self._retried,
+            "abandoned": self._abandoned,
+            "avg_latency": round(self._latency_total / self._delivered, 3) if self._delivered else None,
+            "max_latency": round(self._latency_max, 3) if self._delivered else None
+        }
+        if reset:
+            self._reset()
+        return stats
+
+    async def _deliver_forever(self) -> None:
+        while True:
+            # Cleared before the round so a wake during it triggers another one
+            self._wake.clear()
+            try:
+                claimed = await self.deliver_once()
+                await self._purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox delivery round failed: {e}", exc_info=True)
+                claimed = 0
+
+            # A full batch means more may be waiting
+            if claimed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                continue
+            # Trade a little latency for fewer messages
+            if self.coalesce_window > 0:
+                await asyncio.sleep(self.coalesce_window)
+
+    async def deliver_once(self) -> int:
+        """
+        Claim one batch of due notifications and try to deliver it, returns the number claimed.
+        """
+        outbox = self.db.table(OutboxTable)
+        items = await outbox.claim(self.batch_size, self.lease_seconds)
+        if not items:
+            return 0
+
+        notifications = []
+        for item in items:
+            try:
+                stats = MatchStats(**item["match"])
+            except ValidationError as e:
+                logger.error(f"Outbox item {item['id']} has an unreadable match row: {e}")
+                stats = None
+            notifications.append({"discord_user_id": item["discord_id"], "stats": stats})
+
+        outcomes = await self.notifier.send_bulk_notifications(notifications)
+
+        delivered: List[int] = []
+        failures: List[tuple] = []
+        for item, outcome in zip(items, outcomes):
+            if outcome["sent"]:
+                delivered.append(item["id"])
+                latency = item["age"] + outcome["latency"]
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+            elif outcome["error"] in PERMANENT_ERRORS or item["attempts"] >= self.max_attempts:
+                failures.append((item["id"], None, outcome["error"]))
+                self._abandoned += 1
+            else:
+                failures.append((item["id"], self.backoff(item["attempts"]), outcome["error"]))
+                self._retried += 1
+
+        if delivered:
+            await outbox.mark_delivered(delivered)
+            self._delivered += len(delivered)
+        if failures:
+            await outbox.reschedule(failures)
+
+        logger.info(f"Outbox round: {len(delivered)}/{len(items)} notifications delivered")
+        return len(items)
+
+    async def _purge(self) -> None:
+        now = time.monotonic()
+        if now - self._purged_at < OUTBOX_PURGE_INTERVAL_SECONDS:
+            return
+        self._purged_at = now
+        deleted = await self.db.table(OutboxTable).purge_delivered(OUTBOX_RETENTION_SECONDS)
+        if deleted:
+            logger.info(f"Purged {deleted} delivered notifications from the outbox")
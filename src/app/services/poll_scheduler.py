@@ -0,0 +1,149 @@
+"""Adaptive per-player polling schedule for the tracker job"""
+import heapq
+import itertools
+import random
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _PlayerSchedule:
+    """Polling state for one tracked player"""
+
+    __slots__ = ("player", "interval", "next_due", "version")
+
+    def __init__(self, player: Hashable, interval: float, next_due: float):
+        self.player = player
+        self.interval = interval
+        self.next_due = next_due
+        # Bumped on every reschedule so stale heap entries can be skipped
+        self.version = 0
+
+
+class PollScheduler:
+    """
+    Priority queue of tracked players keyed by when each one is next due for a poll.
+    Idle players back off exponentially up to max_interval, a detected match resets
+    the player to min_interval since matches tend to come in sessions.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 60.0,
+        max_interval: float = 3600.0,
+        backoff_factor: float = 2.0,
+        jitter: float = 0.1
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self._heap: List[Tuple[float, int, int, Hashable]] = []
+        self._entries: Dict[Hashable, _PlayerSchedule] = {}
+        self._in_flight: Dict[Hashable, _PlayerSchedule] = {}
+        self._counter = itertools.count()
+
+    def sync(self, players: Iterable[Hashable], now: Optional[float] = None) -> None:
+        """
+        Bring the schedule in line with the current roster.
+        New players are due immediately, players no longer tracked are dropped.
+        """
+        now = time.monotonic() if now is None else now
+        roster = set(players)
+
+        for player in roster - self._entries.keys():
+            entry = _PlayerSchedule(player, self.min_interval, now)
+            self._entries[player] = entry
+            self._push(entry)
+
+        for player in self._entries.keys() - roster:
+            # Heap entries are skipped lazily once the player has no schedule
+            del self._entries[player]
+            self._in_flight.pop(player, None)
+
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        Remove and return every player whose next poll is due, earliest first.
+        Each one must be handed back through record_poll or record_failure.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+
+        while self._heap and (limit is None or len(due) < limit):
+            next_due, _, version, player = self._heap[0]
+            entry = self._entries.get(player)
+            if entry is None or entry.version != version or player in self._in_flight:
+                heapq.heappop(self._heap)
+                continue
+            if next_due > now:
+                break
+
+            heapq.heappop(self._heap)
+            self._in_flight[player] = entry
+            due.append(player)
+
+        return due
+
+    def record_poll(self, player: Hashable, new_match: bool, now: Optional[float] = None) -> None:
+        """Reschedule a polled player, tightening after a new match and backing off otherwise"""
+        entry = self._in_flight.pop(player, None) or self._entries.get(player)
+        if entry is None:
+            return
+
+        if new_match:
+            entry.interval = self.min_interval
+        else:
+            entry.interval = min(entry.interval * self.backoff_factor, self.max_interval)
+        self._reschedule(entry, now)
+
+    def record_failure(self, player: Hashable, now: Optional[float] = None) -> None:
+        """
+        Retry a player whose poll failed after at most min_interval, without changing their interval.
+        A failed poll says nothing about the player, so it shouldn't cost an idle player a full backed-off interval.
+        """
+        entry = self._in_flight.pop(player, None) or self._entries.get(player)
+        if entry is None:
+            return
+        self._reschedule(entry, now, min(entry.interval, self.min_interval))
+
+    def requeue_unfinished(self, now: Optional[float] = None) -> None:
+        """Make players popped by a tick that never finished due again straight away"""
+        now = time.monotonic() if now is None else now
+        for entry in list(self._in_flight.values()):
+            entry.next_due = now
+            entry.version += 1
+            self._push(entry)
+        self._in_flight.clear()
+
+    def next_due_in(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the earliest scheduled poll, or None if nobody is scheduled"""
+        now = time.monotonic() if now is None else now
+        pending = [entry.next_due for player, entry in self._entries.items() if player not in self._in_flight]
+        return max(min(pending) - now, 0.0) if pending else None
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Return a summary of the schedule for the tick report"""
+        now = time.monotonic() if now is None else now
+        intervals = [entry.interval for entry in self._entries.values()]
+        return {
+            "tracked": len(self._entries),
+            "due": sum(1 for entry in self._entries.values() if entry.next_due <= now),
+            "average_interval": round(sum(intervals) / len(intervals), 1) if intervals else 0.0,
+            # Polls per hour at the current intervals, this scales with activity rather than roster size
+            "polls_per_hour": round(sum(3600 / interval for interval in intervals), 1)
+        }
+
+    def _reschedule(self, entry: _PlayerSchedule, now: Optional[float], delay: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        delay = entry.interval if delay is None else delay
+        # Jitter spreads players that were added together so they don't stay in lockstep.
+        # It only ever pulls the poll earlier so a player isn't pushed past the tick it's due in.
+        spread = delay * self.jitter
+        entry.next_due = now + delay - random.uniform(0, spread)
+        entry.version += 1
+        self._push(entry)
+
+    def _push(self, entry: _PlayerSchedule) -> None:
+        heapq.heappush(self._heap, (entry.next_due, next(self._counter), entry.version, entry.player))
@@ -2,14 +2,22 @@
 import asyncio
 import logging
 import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from dotenv import load_dotenv
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.triggers.date import DateTrigger
 
 import discord
 from app.bot.discord_bot import bot
 from app.services.discord_notifier import DiscordNotifier
+from app.services.outbox_worker import OutboxWorker
 from app.jobs.tracker_job import TrackerJob
+from app.services.poll_scheduler import PollScheduler
+from app.database.connection import start_database, close_database, get_database
+from app.database.migrations import migrate
+from utils.http import start_http_client, close_http_client, get_http_client
+from utils.loop_lag import LoopLagMonitor
 
 # Load environment variables
 load_dotenv()
@@ -21,23 +29,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Tracker interval in minutes
+# The tracker runs again when the next player is due, but at least TRACKER_MIN_DELAY_SECONDS and at most
+# TRACKER_INTERVAL_MINUTES after the last run, so newly added players are picked up within one interval
 TRACKER_INTERVAL_MINUTES = 1
+TRACKER_MIN_DELAY_SECONDS = 10
+
+# Bounds for how often a single player is polled, idle players back off towards the max
+PLAYER_POLL_MIN_SECONDS = 60
+PLAYER_POLL_MAX_SECONDS = 30 * 60
+
+# Postgres connections shared by the tracker and the bot commands
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_CONNECTION_MAX_LIFETIME_SECONDS = 30 * 60
+
+# How long the outbox worker lets notifications pile up after a tick, a recipient's pile goes out as one DM
+NOTIFICATION_COALESCE_SECONDS = float(os.getenv("NOTIFICATION_COALESCE_SECONDS", "2"))
 
 # Global scheduler
 scheduler = AsyncIOScheduler()
 
+# Event-loop lag, blocking calls on the loop also stall the Discord gateway
+loop_lag = LoopLagMonitor()
+
+# Discord notifier, kept across ticks so its user and DM-channel caches stay warm
+notifier = DiscordNotifier(bot)
+
+# Delivers the notifications queued by the tracker, created once the database is up
+outbox_worker: Optional[OutboxWorker] = None
+
+# Per-player polling schedule, kept across ticks
+poll_scheduler = PollScheduler(min_interval=PLAYER_POLL_MIN_SECONDS, max_interval=PLAYER_POLL_MAX_SECONDS)
+
+
+def schedule_next_tracker_run() -> float:
+    """Schedule the next tracker run for when the next player is due, returns the delay in seconds"""
+    max_delay = TRACKER_INTERVAL_MINUTES * 60
+    next_due = poll_scheduler.next_due_in()
+    delay = min(max(next_due if next_due is not None else max_delay, TRACKER_MIN_DELAY_SECONDS), max_delay)
+    scheduler.add_job(
+        run_tracker_job,
+        trigger=DateTrigger(run_date=datetime.now(timezone.utc) + timedelta(seconds=delay)),
+        id='tracker_job',
+        name='Valorant Match Tracker',
+        replace_existing=True,
+        # A late run must still happen, every run schedules the next one
+        misfire_grace_time=None
+    )
+    return delay
+
 
 async def run_tracker_job():
-    """Run the tracker job and send notifications"""
+    """Run the tracker job and schedule the next run, its notifications are delivered by the outbox worker"""
     try:
         logger.info("Starting tracker job...")
-        notifier = DiscordNotifier(bot)
-        job = TrackerJob(notifier=notifier)
+        job = TrackerJob(outbox_worker=outbox_worker, poll_scheduler=poll_scheduler, db=get_database())
         result = await job.execute()
         logger.info(f"Tracker job completed: {result}")
+
+        http_client = get_http_client()
+        if http_client:
+            logger.info(f"HTTP client stats: {http_client.stats()}")
+        logger.info(f"Discord notifier stats: {notifier.stats(reset=True)}")
+        if outbox_worker:
+            logger.info(f"Outbox delivery stats: {outbox_worker.stats(reset=True)}")
+        database = get_database()
+        if database:
+            logger.info(f"Database pool stats: {database.stats()}")
+        logger.info(f"Event loop lag since last run: {loop_lag.snapshot(reset=True)}")
     except Exception as e:
         logger.error(f"Error running tracker job: {e}", exc_info=True)
+    finally:
+        if scheduler.running:
+            logger.info(f"Next tracker run in {schedule_next_tracker_run():.0f}s")
 
 
 @bot.event
@@ -49,30 +112,40 @@ async def on_ready():
     # Set bot status
     await bot.change_presence(activity=discord.Game(name="!tracker"))
 
+    # Deliver queued notifications, including any left over from before a restart
+    if outbox_worker:
+        outbox_worker.start()
+
     # Start the scheduler
     if not scheduler.running:
-        scheduler.add_job(
-            run_tracker_job,
-            trigger=IntervalTrigger(minutes=TRACKER_INTERVAL_MINUTES),
-            id='tracker_job',
-            name='Valorant Match Tracker',
-            replace_existing=True
-        )
         scheduler.start()
-        logger.info(f"Scheduler started - tracker job will run every {TRACKER_INTERVAL_MINUTES} minute(s)")
+        logger.info(
+            f"Scheduler started - tracker job will run when players are due, "
+            f"at least every {TRACKER_INTERVAL_MINUTES} minute(s)"
+        )
 
-        # Run the job immediately on startup
+        # Run the job immediately on startup, each run schedules the next one
         await run_tracker_job()
 
 
 async def main():
     """Main function to run the bot"""
+    global outbox_worker
     token = os.getenv("DISCORD_BOT_TOKEN")
 
     if not token:
         logger.error("DISCORD_BOT_TOKEN not found in environment variables")
         raise ValueError("DISCORD_BOT_TOKEN is required to run the bot")
 
+    # Shared HTTP client so API connections are kept alive across ticks
+    await start_http_client()
+    # Likewise for Postgres, connections are checked out per query instead of opened per tick
+    database = await start_database(max_size=DB_POOL_SIZE, max_lifetime=DB_CONNECTION_MAX_LIFETIME_SECONDS)
+    # Bring the schema up to date once before anything queries it
+    await database.run(migrate)
+    outbox_worker = OutboxWorker(database, notifier, coalesce_window=NOTIFICATION_COALESCE_SECONDS)
+    loop_lag.start()
+
     try:
         await bot.start(token)
     except KeyboardInterrupt:
@@ -80,7 +153,12 @@ async def main():
     finally:
         if scheduler.running:
             scheduler.shutdown()
+        if outbox_worker:
+            await outbox_worker.stop()
         await bot.close()
+        await close_http_client()
+        await close_database()
+        await loop_lag.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+"""Grouping async streams into batches"""
+import asyncio
+from typing import AsyncIterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+async def batch_stream(source: AsyncIterator[T], max_size: int, max_delay: float) -> AsyncIterator[List[T]]:
+    """
+    Yield items from source in lists of at most max_size.
+    A partial batch is yielded once its first item has waited max_delay seconds,
+    so batching never holds an item back for long while the source is slow.
+    """
+    iterator = source.__aiter__()
+    pending: Optional[asyncio.Task] = None
+    batch: List[T] = []
+    deadline = 0.0
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+
+            timeout = max(deadline - loop.time(), 0.0) if batch else None
+            # Wait without cancelling, cancelling __anext__ would close an async generator source
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield batch
+                batch = []
+                continue
+
+            task, pending = pending, None
+            try:
+                item = task.result()
+            except StopAsyncIteration:
+                break
+
+            if not batch:
+                deadline = loop.time() + max_delay
+            batch.append(item)
+            if len(batch) >= max_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Let the cancellation land, the source can't be closed while its __anext__ is still running
+            await asyncio.wait({pending})
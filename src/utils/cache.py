@@ -0,0 +1,55 @@
+"""Bounded in-memory caches"""
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Least-recently-used cache of at most max_size entries, each expiring ttl seconds after it was set.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[V, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value, or None if it's missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Cache a value, evicting the least recently used entry when full"""
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a cached value, e.g. after it turned out to be stale"""
+        self._entries.pop(key, None)
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        """Return hit and miss counts since the last reset"""
+        stats = {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+        if reset:
+            self.hits = 0
+            self.misses = 0
+        return stats
@@ -0,0 +1,67 @@
+"""JSON decoding helpers with optional fast backends"""
+import json
+from typing import Any, Callable, Dict, Optional
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+# A decoder turns a raw response body into Python objects
+Decoder = Callable[[bytes], Any]
+
+
+def _decode_stdlib(body: bytes) -> Any:
+    return json.loads(body)
+
+
+JSON_DECODERS: Dict[str, Decoder] = {"json": _decode_stdlib}
+if msgspec is not None:
+    JSON_DECODERS["msgspec"] = msgspec.json.decode
+if orjson is not None:
+    JSON_DECODERS["orjson"] = orjson.loads
+
+# Fastest available backend first
+_PREFERRED_DECODERS = ("orjson", "msgspec", "json")
+
+
+def get_json_decoder(name: Optional[str] = None) -> Decoder:
+    """
+    Return a JSON decoder by name, or the fastest one installed if no name is given.
+    """
+    if name is not None:
+        if name not in JSON_DECODERS:
+            raise ValueError(f"JSON decoder '{name}' is not available, installed: {', '.join(JSON_DECODERS)}")
+        return JSON_DECODERS[name]
+
+    return next(JSON_DECODERS[decoder] for decoder in _PREFERRED_DECODERS if decoder in JSON_DECODERS)
+
+
+def is_json_content_type(content_type: Optional[str]) -> bool:
+    """Check for application/json and structured-syntax +json types"""
+    if not content_type:
+        return False
+    mime_type = content_type.split(";", 1)[0].strip().lower()
+    return mime_type == "application/json" or mime_type.endswith("+json")
+
+
+def decode_body(body: bytes, content_type: Optional[str], decoder: Decoder, charset: Optional[str] = None) -> Any:
+    """
+    Decode a response body that has already been read once.
+    JSON bodies go through the decoder, anything else (or invalid JSON) comes back as text.
+    """
+    if is_json_content_type(content_type):
+        try:
+            return decoder(body)
+        except Exception as e:
+            logger.debug(f"Failed to decode JSON body, falling back to text: {e}")
+
+    return body.decode(charset or "utf-8", errors="replace")
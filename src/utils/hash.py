@@ -1,6 +1,9 @@
 """Hash utility functions for generating unique identifiers"""
 import hashlib
 
+# Fixed BLAKE2b key for 64-bit database keys. Changing it changes every key, so it must stay constant.
+KEY_DIGEST_KEY = b"discord-valorant-tracker"
+
 
 def generate_hash(identifier: str, length: int = 16) -> str:
     """
@@ -9,17 +12,36 @@ def generate_hash(identifier: str, length: int = 16) -> str:
     return hashlib.sha256(identifier.encode()).hexdigest()[:length]
 
 
-def generate_player_hash(username: str, tag: str, discord_id: int) -> str:
+def generate_key(identifier: str, person: bytes = b"") -> int:
     """
-    Generate a unique hash for a player based on username and tag.
+    Generate a signed 64-bit key (fits a Postgres BIGINT) from an identifier string
+    with keyed BLAKE2b. person separates key spaces so equal identifiers of different kinds never collide.
     """
-    identifier = f"{username}#{tag}:{discord_id}"
-    return generate_hash(identifier, length=16)
+    digest = hashlib.blake2b(identifier.encode(), digest_size=8, key=KEY_DIGEST_KEY, person=person).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def account_key(username: str, tag: str) -> str:
+    """
+    Canonical identity of a Riot account, e.g. "player#na1".
+    Riot IDs are case-insensitive, so every spelling of an account maps to the same key.
+    Matches the LOWER(username), LOWER(tag) identity the database enforces.
+    """
+    return f"{username.lower()}#{tag.lower()}"
 
 
 def generate_match_hash(match_id: str, username: str, tag: str) -> str:
     """
     Generate a unique hash for a player's match performance.
+    Kept spelling-sensitive: stored rows can't be rehashed without their API match id,
+    generate_match_key is the canonical identity.
     """
     identifier = f"{match_id}:{username}#{tag}"
     return generate_hash(identifier, length=16)
+
+
+def generate_match_key(match_id: str, username: str, tag: str) -> int:
+    """
+    Generate a unique 64-bit key for a player's match performance, the BIGINT counterpart of generate_match_hash.
+    """
+    return generate_key(f"{match_id}:{account_key(username, tag)}", person=b"match")
@@ -1,31 +1,708 @@
 """HTTP utility functions for making concurrent requests"""
 import asyncio
+import itertools
+import random
+import time
 import aiohttp
-from typing import List, Tuple, Dict, Any, Optional
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from collections import deque
+from typing import List, Tuple, Dict, Any, Optional, Mapping, AsyncIterator, Union, Callable, Awaitable, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+from utils.decoding import Decoder, decode_body, get_json_decoder
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class RateLimiter:
+    """Token bucket that follows the rate-limit headers returned by the upstream API"""
+
+    def __init__(self, capacity: int = 30, window: float = 60.0):
+        self.capacity = capacity
+        self.window = window
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens added per second"""
+        return self.capacity / self.window
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if now >= self._blocked_until:
+            self._tokens = min(float(self.capacity), self._tokens + elapsed * self.refill_rate)
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+        """
+        # The lock keeps waiters in FIFO order so nobody starves under load
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.refill_rate
+
+                await asyncio.sleep(wait)
+
+    def update_from_headers(self, status: int, headers: Mapping[str, str]) -> None:
+        """
+        Adjust the bucket to the budget reported by the API.
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        limit = _parse_number(headers.get("x-ratelimit-limit"))
+        remaining = _parse_number(headers.get("x-ratelimit-remaining"))
+        reset = _parse_number(headers.get("x-ratelimit-reset"))
+        retry_after = _parse_retry_after(headers.get("Retry-After"))
+
+        if limit and limit > 0:
+            self.capacity = int(limit)
+            self._tokens = min(self._tokens, float(self.capacity))
+
+        # The server's count is authoritative, but never hand out more than we already think we have
+        if remaining is not None:
+            self._tokens = min(self._tokens, max(remaining, 0.0))
+            if remaining <= 0 and reset:
+                self._block(now, reset)
+
+        if status == 429:
+            self._tokens = 0.0
+            self._block(now, retry_after or reset or 1.0)
+            logger.warning(f"Rate limited by upstream API, pausing for {self._blocked_until - now:.1f}s")
+
+    def _block(self, now: float, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, now + seconds)
+
+    def budget(self) -> Dict[str, float]:
+        """Return the current budget so callers can plan around it"""
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "tokens": int(self._tokens),
+            "capacity": self.capacity,
+            "refill_per_second": round(self.refill_rate, 3),
+            "blocked_for": round(max(self._blocked_until - now, 0.0), 3)
+        }
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric header value, ignoring anything malformed"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After as either delta-seconds or an HTTP date"""
+    if value is None:
+        return None
+    seconds = _parse_number(value)
+    if seconds is not None:
+        return max(seconds, 0.0)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RequestError(Exception):
+    """Base class for classified request failures"""
+    retryable = False
+    # Whether the failure says something about the upstream's health
+    trips_breaker = False
+
+    def __init__(self, message: str, result: Dict[str, Any]):
+        super().__init__(message)
+        result["error"] = message
+        result["error_type"] = type(self).__name__
+        self.result = result
+
+
+class RequestTimeoutError(RequestError):
+    """The request did not complete within its timeout"""
+    retryable = True
+    trips_breaker = True
+
+
+class RequestConnectionError(RequestError):
+    """The connection was refused, reset or dropped"""
+    retryable = True
+    trips_breaker = True
+
+
+class RateLimitedError(RequestError):
+    """The API answered 429 Too Many Requests"""
+    retryable = True
+
+
+class ServerError(RequestError):
+    """The API answered with a 5xx status"""
+    retryable = True
+    trips_breaker = True
+
+
+class PermanentClientError(RequestError):
+    """The API answered with a 4xx status that will not change on retry"""
+    retryable = False
+
+
+class CircuitOpenError(RequestError):
+    """The request was short-circuited because its endpoint's breaker is open"""
+    retryable = False
+
+
+def _classify_status(status: int) -> Optional[type]:
+    """Map an HTTP status to the error class it should raise, if any"""
+    if status == 429:
+        return RateLimitedError
+    if status >= 500:
+        return ServerError
+    if status >= 400:
+        return PermanentClientError
+    return None
+
+
+class RetryPolicy:
+    """Per-request attempt budget with jittered exponential backoff"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: RequestError, attempt: int) -> bool:
+        """Retry transient errors until the attempt budget is spent"""
+        return error.retryable and attempt < self.max_attempts
+
+    def backoff(self, error: RequestError, attempt: int) -> float:
+        """
+        Return how long to wait before the next attempt.
+        """
+        # The rate limiter already waits out Retry-After before handing out the next token
+        if isinstance(error, RateLimitedError):
+            return 0.0
+        # Full jitter spreads retries out so failed requests don't come back in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for a single upstream endpoint family"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Permit for a request that isn't a half-open probe
+    NO_PROBE = 0
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window_size: int = 20,
+        min_requests: int = 5,
+        reset_timeout: float = 60.0,
+        half_open_probes: int = 1
+    ):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        # Tokens of the half-open probes in flight, unique so a stale token can't free someone else's slot
+        self._probes: Set[int] = set()
+        self._probe_tokens = itertools.count(1)
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the reset timeout has passed"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes.clear()
+        return self._state
+
+    def allow_request(self) -> Optional[int]:
+        """
+        Return a permit if a request may be sent right now, None if it must be short-circuited.
+        In half-open state the permit is a probe token that holds one of the probe slots until released,
+        otherwise it is NO_PROBE.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return self.NO_PROBE
+        if state == self.HALF_OPEN and len(self._probes) < self.half_open_probes:
+            token = next(self._probe_tokens)
+            self._probes.add(token)
+            return token
+        return None
+
+    def release(self, permit: int) -> None:
+        """
+        Hand back a permit from allow_request once its request is done, cancelled or about to be retried.
+        Only frees the probe slot that permit took, if any.
+        """
+        self._probes.discard(permit)
+
+    def record_success(self) -> None:
+        if self._state == self.HALF_OPEN:
+            logger.info("Circuit breaker closed, upstream has recovered")
+            self._state = self.CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self._state == self.HALF_OPEN:
+            self._open()
+            return
+        if self._state == self.OPEN:
+            # A straggler that was already in flight when the breaker opened
+            return
+
+        self._outcomes.append(False)
+        failures = self._outcomes.count(False)
+        if (
+            self._state == self.CLOSED and
+            len(self._outcomes) >= self.min_requests and
+            failures / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        logger.warning(f"Circuit breaker opened, short-circuiting requests for {self.reset_timeout}s")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the breaker's state for logging and scheduling decisions"""
+        state = self.state
+        return {
+            "state": state,
+            "failures": self._outcomes.count(False),
+            "window": len(self._outcomes),
+            "retry_in": (
+                round(max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0), 3)
+                if state == self.OPEN else 0.0
+            )
+        }
+
+
+def endpoint_key(url: str, depth: int = 3) -> str:
+    """
+    Group a URL into its endpoint family: the host plus the first few path segments.
+    e.g. https://api.henrikdev.xyz/valorant/v4/matches/na/pc/name/tag -> api.henrikdev.xyz/valorant/v4/matches
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment][:depth]
+    return "/".join([parts.netloc, *segments])
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            "upstream_calls": 0,
+            "coalesced": 0
+        }
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for the first caller with this key, every concurrent caller shares its result.
+        The shared result is the same object for every caller, so treat it as read-only.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self._stats["upstream_calls"] += 1
+        else:
+            self._stats["coalesced"] += 1
+
+        # Shield so one caller being cancelled doesn't cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+def normalize_request_key(method: str, url: str) -> str:
+    """
+    Build the single-flight key for a request.
+    Host and path are case-folded and unquoted since Henrik's API treats name/tag case-insensitively,
+    and query parameters are sorted so their order doesn't matter.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = unquote(parts.path).lower().rstrip("/")
+    return f"{method.upper()} {urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))}"
+
+
+class HttpClient:
+    """Long-lived HTTP client that keeps connections to upstream APIs warm between ticks"""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 60,
+        dns_cache_ttl: int = 300,
+        rate_limit: int = 30,
+        rate_limit_window: float = 60.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker_failure_rate: float = 0.5,
+        breaker_reset_timeout: float = 60.0,
+        request_key: Callable[[str, str], str] = normalize_request_key,
+        json_decoder: Optional[Decoder] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_failure_rate = breaker_failure_rate
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.request_key = request_key
+        self.json_decoder = json_decoder or get_json_decoder()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._single_flight = SingleFlight()
+        self._stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "retries": 0,
+            "short_circuited": 0
+        }
+
+    async def __aenter__(self) -> 'HttpClient':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HttpClient has not been started")
+        return self._session
+
+    async def start(self) -> None:
+        """Create the shared session and connection pool"""
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            enable_cleanup_closed=True
+        )
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._build_trace_config()])
+        logger.info(
+            f"HTTP client started (limit={self.limit}, limit_per_host={self.limit_per_host}, "
+            f"keepalive={self.keepalive_timeout}s)"
+        )
+
+    async def close(self) -> None:
+        """Close the shared session and every pooled connection"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"HTTP client closed: {self.stats()}")
+        self._session = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return request, connection reuse and coalescing counters"""
+        single_flight = self._single_flight.stats()
+        return {
+            **self._stats,
+            "coalesced": single_flight["coalesced"]
+        }
+
+    def rate_limiter(self, host: str) -> RateLimiter:
+        """Return the token bucket for a host, creating it on first use"""
+        limiter = self._rate_limiters.get(host)
+        if limiter is None:
+            limiter = RateLimiter(self.rate_limit, self.rate_limit_window)
+            self._rate_limiters[host] = limiter
+        return limiter
+
+    def rate_limit_budget(self, host: str) -> Dict[str, float]:
+        """Return the current request budget for a host"""
+        return self.rate_limiter(host).budget()
+
+    def circuit_breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker for a URL's endpoint family, creating it on first use"""
+        key = endpoint_key(url)
+        breaker = self._circuit_breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(failure_rate=self.breaker_failure_rate, reset_timeout=self.breaker_reset_timeout)
+            self._circuit_breakers[key] = breaker
+        return breaker
+
+    def circuit_state(self, url: str) -> str:
+        """Return the breaker state (closed, open or half_open) for a URL's endpoint family"""
+        return self.circuit_breaker(url).state
+
+    def circuit_breakers(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of every breaker keyed by endpoint family"""
+        return {key: breaker.snapshot() for key, breaker in self._circuit_breakers.items()}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        json_body: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30,
+        decoder: Optional[Decoder] = None
+    ) -> Dict[str, Any]:
+        """
+        Make a single request. Concurrent identical GETs share one upstream call and one decoded result.
+        JSON bodies are decoded with `decoder`, defaulting to the client's json_decoder.
+        """
+        decoder = decoder or self.json_decoder
+
+        if method.upper() in ("GET", "HEAD") and json_body is None:
+            # Callers asking for a different decoding of the same URL can't share a result
+            key = f"{self.request_key(method, url)} decoder={id(decoder)}"
+            return await self._single_flight.do(
+                key,
+                lambda: self._request(method, url, json_body, headers, timeout, decoder)
+            )
+
+        return await self._request(method, url, json_body, headers, timeout, decoder)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        json_body: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+        timeout: int,
+        decoder: Decoder
+    ) -> Dict[str, Any]:
+        """
+        Make a single upstream request, waiting for a rate-limit token first and retrying transient failures.
+        Requests to an endpoint family whose circuit breaker is open fail fast with CircuitOpenError.
+        """
+        limiter = self.rate_limiter(urlsplit(url).netloc)
+        breaker = self.circuit_breaker(url)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            permit = breaker.allow_request()
+            if permit is None:
+                self._stats["short_circuited"] += 1
+                error = CircuitOpenError(f"Circuit open for {endpoint_key(url)}", _empty_result(url))
+                error.result["attempts"] = attempt
+                return error.result
+
+            try:
+                await limiter.acquire()
+                result = await _make_request(self.session, method, url, json_body, headers, timeout, limiter, decoder)
+                breaker.record_success()
+                result["attempts"] = attempt
+                return result
+            except RequestError as e:
+                e.result["attempts"] = attempt
+                if not self.retry_policy.should_retry(e, attempt):
+                    # The breaker counts requests, not attempts, so one failing call can't fill its window alone
+                    if e.trips_breaker:
+                        breaker.record_failure()
+                    elif isinstance(e, PermanentClientError):
+                        # The endpoint answered, it's the request that's wrong
+                        breaker.record_success()
+                    # Rate-limited or unreadable responses say nothing about the endpoint's health either way
+                    logger.error(f"Request failed for {url} after {attempt} attempt(s): {e}")
+                    return e.result
+
+                delay = self.retry_policy.backoff(e, attempt)
+                retried = e
+            finally:
+                # A probe that's retried or cancelled would otherwise hold its half-open slot forever
+                breaker.release(permit)
+
+            logger.info(f"{type(retried).__name__} for {url}, retrying in {delay:.2f}s (attempt {attempt})")
+            self._stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Count new vs reused connections so handshake savings are visible"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self._stats["requests"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            self._stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self._stats["connections_reused"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+
+# Process-wide client, created at startup and closed on shutdown
+_client: Optional[HttpClient] = None
+
+
+async def start_http_client(**kwargs) -> HttpClient:
+    """
+    Start the process-wide HTTP client.
+    """
+    global _client
+    if _client is None:
+        _client = HttpClient(**kwargs)
+    await _client.start()
+    return _client
+
+
+async def close_http_client() -> None:
+    """
+    Close the process-wide HTTP client.
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_http_client() -> Optional[HttpClient]:
+    """
+    Return the process-wide HTTP client, or None if it has not been started.
+    """
+    return _client
+
+
 async def request_many(
     requests: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]],
-    timeout: int = 30
+    timeout: int = 30,
+    decoder: Optional[Decoder] = None
 ) -> List[Dict[str, Any]]:
     """
     Make multiple HTTP requests concurrently.
     """
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for request_tuple in requests:
-            method = request_tuple[0]
-            url = request_tuple[1]
-            json_body = request_tuple[2] if len(request_tuple) > 2 else None
-            headers = request_tuple[3] if len(request_tuple) > 3 else None
+    client = get_http_client()
+    if client is None:
+        # No shared client (e.g. a job run directly), fall back to a short-lived one
+        async with HttpClient() as client:
+            return await _gather_requests(client, requests, timeout, decoder)
+
+    return await _gather_requests(client, requests, timeout, decoder)
+
+
+async def stream_requests(
+    requests: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]],
+    timeout: int = 30,
+    concurrency: int = 10,
+    decoder: Optional[Decoder] = None,
+    skip: Optional[Callable[[int], bool]] = None
+) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], BaseException]]]:
+    """
+    Make multiple HTTP requests concurrently, yielding (index, result) pairs as each one completes.
+    At most `concurrency` requests are in flight at once. If `skip(index)` returns True when a
+    request's turn comes, it is dropped without being sent and nothing is yielded for it.
+    """
+    client = get_http_client()
+    if client is None:
+        # No shared client (e.g. a job run directly), fall back to a short-lived one
+        async with HttpClient() as client:
+            async for item in _stream_requests(client, requests, timeout, concurrency, decoder, skip):
+                yield item
+        return
+
+    async for item in _stream_requests(client, requests, timeout, concurrency, decoder, skip):
+        yield item
+
 
-            tasks.append(_make_request(session, method, url, json_body, headers, timeout))
+async def _gather_requests(
+    client: HttpClient,
+    requests: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]],
+    timeout: int,
+    decoder: Optional[Decoder]
+) -> List[Dict[str, Any]]:
+    """Run every request through the given client and gather the results in order"""
+    tasks = [client.request(*_unpack_request(request_tuple), timeout, decoder) for request_tuple in requests]
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+async def _stream_requests(
+    client: HttpClient,
+    requests: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]],
+    timeout: int,
+    concurrency: int,
+    decoder: Optional[Decoder],
+    skip: Optional[Callable[[int], bool]]
+) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], BaseException]]]:
+    """Run every request through the given client and yield results in completion order"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, request_tuple: tuple) -> Optional[Tuple[int, Dict[str, Any]]]:
+        async with semaphore:
+            # Checked at dispatch time so results that arrived in the meantime can make this one redundant
+            if skip and skip(index):
+                return None
+            return index, await client.request(*_unpack_request(request_tuple), timeout, decoder)
+
+    tasks = {asyncio.create_task(run(index, request_tuple)): index for index, request_tuple in enumerate(requests)}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # Mirror asyncio.gather(return_exceptions=True): failures are yielded, not raised
+                if task.exception() is not None:
+                    yield tasks[task], task.exception()
+                elif task.result() is not None:
+                    yield task.result()
+    finally:
+        # The consumer stopped early (or failed), don't leave requests running in the background
+        for task in pending:
+            task.cancel()
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        return results
+
+def _unpack_request(
+    request_tuple: tuple
+) -> Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]:
+    """Split a (method, url[, json_body[, headers]]) tuple into its parts"""
+    method = request_tuple[0]
+    url = request_tuple[1]
+    json_body = request_tuple[2] if len(request_tuple) > 2 else None
+    headers = request_tuple[3] if len(request_tuple) > 3 else None
+    return method, url, json_body, headers
 
 
 async def _make_request(
@@ -34,9 +711,12 @@ async def _make_request(
     url: str,
     json_body: Optional[Dict[str, Any]],
     headers: Optional[Dict[str, str]],
-    timeout: int
+    timeout: int,
+    limiter: Optional[RateLimiter] = None,
+    decoder: Optional[Decoder] = None
 ) -> Dict[str, Any]:
-    """Make a single HTTP request"""
+    """Make a single HTTP request, raising a classified RequestError on failure"""
+    result = _empty_result(url)
     try:
         async with session.request(
             method=method,
@@ -45,22 +725,33 @@ async def _make_request(
             headers=headers,
             timeout=aiohttp.ClientTimeout(total=timeout)
         ) as response:
-            try:
-                data = await response.json()
-            except Exception:
-                data = await response.text()
-
-            return {
-                "status": response.status,
-                "data": data,
-                "url": url,
-                "error": None
-            }
+            if limiter:
+                limiter.update_from_headers(response.status, response.headers)
+
+            # Read the body once and decode it ourselves instead of json() with a text() fallback
+            body = await response.read()
+            result["status"] = response.status
+            result["data"] = decode_body(body, response.content_type, decoder or get_json_decoder(), response.charset)
+    except TimeoutError as e:
+        raise RequestTimeoutError(f"Timed out after {timeout}s", result) from e
+    except (aiohttp.ClientConnectionError, ConnectionError) as e:
+        raise RequestConnectionError(str(e) or type(e).__name__, result) from e
     except Exception as e:
-        logger.error(f"Request failed for {url}: {e}")
-        return {
-            "status": None,
-            "data": None,
-            "url": url,
-            "error": str(e)
-        }
+        raise RequestError(str(e) or type(e).__name__, result) from e
+
+    error_class = _classify_status(result["status"])
+    if error_class:
+        raise error_class(f"HTTP {result['status']}", result)
+
+    return result
+
+
+def _empty_result(url: str) -> Dict[str, Any]:
+    """Result dict for a request that has not produced a response yet"""
+    return {
+        "status": None,
+        "data": None,
+        "url": url,
+        "error": None,
+        "error_type": None
+    }
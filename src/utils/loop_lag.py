@@ -0,0 +1,65 @@
+"""Event-loop lag measurement"""
+import asyncio
+import time
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a short sleep.
+    Anything blocking the loop (e.g. a synchronous database call) shows up as lag.
+    """
+
+    def __init__(self, interval: float = 0.1, warn_threshold: float = 0.5):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._samples = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def start(self) -> None:
+        """Start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self, reset: bool = False) -> Dict[str, float]:
+        """
+        Return lag statistics in milliseconds since the last reset.
+        """
+        stats = {
+            "samples": self._samples,
+            "avg_ms": round(self._total / self._samples * 1000, 2) if self._samples else 0.0,
+            "max_ms": round(self._max * 1000, 2)
+        }
+        if reset:
+            self._reset()
+        return stats
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - started - self.interval, 0.0)
+
+            self._samples += 1
+            self._total += lag
+            self._max = max(self._max, lag)
+            if lag >= self.warn_threshold:
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")